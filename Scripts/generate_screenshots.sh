@@ -28,4 +28,8 @@ echo "- 确保界面语言正确（中文/英文）"
 echo "- 隐藏状态栏时间，使用 9:41"
 echo ""
 echo "自动化方案："
-echo "可以使用 fastlane snapshot 自动生成"
\ No newline at end of file
+echo "可以使用 fastlane snapshot 自动生成"
+echo ""
+echo "离线天气数据："
+echo "- 录制: python3 weather_fixtures.py record weather city=Beijing"
+echo "- 回放: python3 weather_fixtures.py serve，并把 ApiConfig.proxyBaseURL 指向 http://127.0.0.1:8787"
@@ -3,26 +3,42 @@
 自动添加 Widget Extension 到 Xcode 项目
 """
 
+import argparse
 import os
 import re
 import uuid
 import subprocess
 
+import instrumentation
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+
 def generate_uuid():
     """生成 Xcode 使用的 24 字符 UUID"""
     return ''.join(str(uuid.uuid4()).split('-'))[:24].upper()
 
+def search(pattern, content, flags=0):
+    """re.search，同时记录正则匹配次数"""
+    instrumentation.count("regex.search")
+    return re.search(pattern, content, flags)
+
 def read_project_file():
     """读取项目文件"""
-    project_path = "/Users/weifu/Desktop/Weather/Weather.xcodeproj/project.pbxproj"
-    with open(project_path, 'r') as f:
-        return f.read()
+    project_path = project_paths.project_file(PROJECT_ROOT)
+    with instrumentation.span("read", project_path):
+        with open(project_path, 'r') as f:
+            content = f.read()
+    instrumentation.count("bytes_read", len(content.encode("utf-8")))
+    return content
 
 def write_project_file(content):
     """写入项目文件"""
-    project_path = "/Users/weifu/Desktop/Weather/Weather.xcodeproj/project.pbxproj"
-    with open(project_path, 'w') as f:
-        f.write(content)
+    project_path = project_paths.project_file(PROJECT_ROOT)
+    with instrumentation.span("write", project_path):
+        with open(project_path, 'w') as f:
+            f.write(content)
+    instrumentation.count("bytes_written", len(content.encode("utf-8")))
 
 def add_widget_files_to_project():
     """添加 Widget 文件到项目"""
@@ -52,7 +68,7 @@ def add_widget_files_to_project():
     widget_intent_build_id = generate_uuid()
     
     # 查找主应用的 target ID
-    main_target_match = re.search(r'75002DAE2E0741CD00E5E081.*?/\* WeathersPro \*/', content)
+    main_target_match = search(r'75002DAE2E0741CD00E5E081.*?/\* WeathersPro \*/', content)
     if not main_target_match:
         print("❌ 无法找到主应用 target")
         return False
@@ -127,7 +143,7 @@ def add_widget_files_to_project():
     
     # 在主 group 中添加 Widget group
     main_group_pattern = r'(75002DA62E0741CD00E5E081 = \{[^}]+children = \([^)]+)'
-    main_group_match = re.search(main_group_pattern, content, re.DOTALL)
+    main_group_match = search(main_group_pattern, content, re.DOTALL)
     if main_group_match:
         new_children = main_group_match.group(1) + f"\n\t\t\t\t{widget_group_id} /* WeatherWidget */,"
         content = content.replace(main_group_match.group(1), new_children)
@@ -140,7 +156,7 @@ def add_widget_files_to_project():
     
     # 添加到 Products group
     products_pattern = r'(75002DB02E0741CD00E5E081 /\* Products \*/ = \{[^}]+children = \([^)]+)'
-    products_match = re.search(products_pattern, content, re.DOTALL)
+    products_match = search(products_pattern, content, re.DOTALL)
     if products_match:
         new_products = products_match.group(1) + f"\n\t\t\t\t{widget_product_id} /* WeatherWidgetExtension.appex */,"
         content = content.replace(products_match.group(1), new_products)
@@ -329,14 +345,14 @@ def add_widget_files_to_project():
     
     # 添加 Widget target 到项目的 targets 列表
     project_targets_pattern = r'(targets = \([^)]+)'
-    project_targets_match = re.search(project_targets_pattern, content)
+    project_targets_match = search(project_targets_pattern, content)
     if project_targets_match:
         new_targets = project_targets_match.group(1) + f"\n\t\t\t\t{widget_target_id} /* WeatherWidgetExtension */,"
         content = content.replace(project_targets_match.group(1), new_targets)
     
     # 添加 Embed App Extensions build phase 到主 target
     main_target_pattern = r'(75002DAE2E0741CD00E5E081 /\* WeathersPro \*/ = \{[^}]+buildPhases = \([^)]+)'
-    main_target_match = re.search(main_target_pattern, content, re.DOTALL)
+    main_target_match = search(main_target_pattern, content, re.DOTALL)
     if main_target_match:
         new_phases = main_target_match.group(1) + f"\n\t\t\t\t{widget_embed_phase_id} /* Embed App Extensions */,"
         content = content.replace(main_target_match.group(1), new_phases)
@@ -382,7 +398,7 @@ def add_widget_files_to_project():
 def update_project_capabilities():
     """更新项目权限设置"""
     # 创建 xcworkspace 数据
-    workspace_path = "/Users/weifu/Desktop/Weather/Weather.xcodeproj/project.xcworkspace/contents.xcworkspacedata"
+    workspace_path = os.path.join(PROJECT_ROOT, project_paths.PROJECT_BUNDLE, "project.xcworkspace", "contents.xcworkspacedata")
     os.makedirs(os.path.dirname(workspace_path), exist_ok=True)
     
     workspace_content = """<?xml version="1.0" encoding="UTF-8"?>
@@ -399,11 +415,12 @@ def update_project_capabilities():
     
     print("✅ 更新了 workspace 设置")
 
-def main():
+def main(argv=None):
+    argparse.ArgumentParser(description="自动添加 Widget Extension 到 Xcode 项目").parse_args(argv)
     print("🚀 开始自动配置 Widget Extension...")
     
     # 备份项目文件
-    project_path = "/Users/weifu/Desktop/Weather/Weather.xcodeproj/project.pbxproj"
+    project_path = project_paths.project_file(PROJECT_ROOT)
     backup_path = project_path + ".backup"
     
     try:
@@ -417,8 +434,11 @@ def main():
         return
     
     # 添加 Widget 到项目
-    if add_widget_files_to_project():
-        update_project_capabilities()
+    with instrumentation.span("mutate", "add widget target"):
+        added = add_widget_files_to_project()
+    if added:
+        with instrumentation.span("write", "workspace"):
+            update_project_capabilities()
         
         print("\n✅ Widget Extension 配置完成！")
         print("\n📝 接下来的步骤：")
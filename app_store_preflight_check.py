@@ -1,21 +1,40 @@
 #!/usr/bin/env python3
 """
 App Store 上架前检查脚本
+
+每项检查在 CHECKS 中声明版本和输入文件，结果按输入文件的内容缓存在
+.preflight_cache.json 中（见 check_cache.py），输入未变化的检查直接输出
+上次的结果。修改检查逻辑时需要递增对应的版本号。
 """
 
+import argparse
+import contextlib
+import functools
+import io
 import os
-import plistlib
-import re
+import sys
+
+import instrumentation
+import project_client
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+CACHE_PATH = os.path.join(PROJECT_ROOT, ".preflight_cache.json")
+INFO_PLIST_PATH = os.path.join(PROJECT_ROOT, "Weather", "Info.plist")
+PROJECT_FILE_PATH = project_paths.project_file(PROJECT_ROOT)
+APP_ICON_PATH = os.path.join(PROJECT_ROOT, "Weather", "Assets.xcassets", "AppIcon.appiconset")
+REQUIRED_FILES = [
+    INFO_PLIST_PATH,
+    os.path.join(PROJECT_ROOT, "WeatherWidget", "Info.plist"),
+    os.path.join(PROJECT_ROOT, "Weather", "Assets.xcassets"),
+]
 
 def check_info_plist():
     """检查 Info.plist 配置"""
     print("🔍 检查 Info.plist 配置...")
     
-    plist_path = "/Users/weifu/Desktop/Weather/Weather/Info.plist"
-    
     try:
-        with open(plist_path, 'rb') as f:
-            plist = plistlib.load(f)
+        plist = project_client.read_plist(INFO_PLIST_PATH, PROJECT_ROOT)
         
         checks = {
             "应用显示名称": plist.get('CFBundleDisplayName', '未设置'),
@@ -35,30 +54,34 @@ def check_project_settings():
     """检查项目设置"""
     print("\n🔍 检查项目设置...")
     
-    project_path = "/Users/weifu/Desktop/Weather/Weather.xcodeproj/project.pbxproj"
-    
     try:
-        with open(project_path, 'r') as f:
-            content = f.read()
+        # 常驻进程运行时直接取其解析结果，否则只解析 XCBuildConfiguration section
+        configurations = project_client.read_section("XCBuildConfiguration", PROJECT_FILE_PATH, PROJECT_ROOT)
+        
+        def first_setting(key):
+            for config in configurations.values():
+                value = config.get("buildSettings", {}).get(key)
+                if value is not None:
+                    return value
+            return None
         
         # 检查 Bundle ID
-        bundle_ids = re.findall(r'PRODUCT_BUNDLE_IDENTIFIER = ([^;]+);', content)
-        if bundle_ids:
-            print(f"  ✅ Bundle ID: {bundle_ids[0].strip()}")
+        bundle_id = first_setting("PRODUCT_BUNDLE_IDENTIFIER")
+        if bundle_id:
+            print(f"  ✅ Bundle ID: {bundle_id}")
         else:
             print("  ❌ Bundle ID: 未找到")
         
         # 检查版本号
-        marketing_versions = re.findall(r'MARKETING_VERSION = ([^;]+);', content)
-        if marketing_versions:
-            print(f"  ✅ 版本号: {marketing_versions[0].strip()}")
+        marketing_version = first_setting("MARKETING_VERSION")
+        if marketing_version:
+            print(f"  ✅ 版本号: {marketing_version}")
         else:
             print("  ❌ 版本号: 未找到")
         
         # 检查部署目标
-        deployment_targets = re.findall(r'IPHONEOS_DEPLOYMENT_TARGET = ([^;]+);', content)
-        if deployment_targets:
-            target = deployment_targets[0].strip()
+        target = first_setting("IPHONEOS_DEPLOYMENT_TARGET")
+        if target:
             print(f"  ✅ iOS 部署目标: {target}")
             if float(target) < 14.0:
                 print("  ⚠️  建议将部署目标设置为 14.0 以支持小组件")
@@ -68,17 +91,50 @@ def check_project_settings():
     except Exception as e:
         print(f"❌ 读取项目文件失败: {e}")
 
+def check_effective_settings():
+    """检查各 target 实际生效的设置"""
+    print("\n🔍 检查各 target 的有效设置 (Release)...")
+    
+    import build_settings
+
+    try:
+        resolver = build_settings.load_resolver(source_root=PROJECT_ROOT)
+        app_bundle_id = None
+        for target in resolver.graph.targets():
+            if "Release" not in resolver.configuration_names(target.name):
+                continue
+            bundle_id = resolver.resolve(target.name, "Release", "PRODUCT_BUNDLE_IDENTIFIER")
+            deployment = resolver.resolve(target.name, "Release", "IPHONEOS_DEPLOYMENT_TARGET")
+            print(f"  ✅ {target.name}: {bundle_id or '未设置'} (iOS {deployment or '未设置'})")
+            if target.productType == "com.apple.product-type.application":
+                app_bundle_id = bundle_id
+            elif target.productType == "com.apple.product-type.app-extension" and app_bundle_id:
+                if not (bundle_id or "").startswith(app_bundle_id + "."):
+                    print(f"  ❌ {target.name} 的 Bundle ID 必须以 {app_bundle_id}. 开头")
+    except Exception as e:
+        print(f"❌ 计算有效设置失败: {e}")
+
+def check_localization():
+    """检查字符串表与代码中使用的本地化 key"""
+    print("\n🔍 检查本地化...")
+    import localization_check
+    
+    try:
+        reports, errors = localization_check.check_project(PROJECT_ROOT)
+    except Exception as e:
+        print(f"  ❌ 本地化检查失败: {e}")
+        return
+    
+    if not reports and not errors:
+        print("  ⚠️  没有找到字符串表")
+        return
+    localization_check.print_report(reports, errors)
+
 def check_required_files():
     """检查必需文件"""
     print("\n🔍 检查必需文件...")
     
-    required_files = [
-        "/Users/weifu/Desktop/Weather/Weather/Info.plist",
-        "/Users/weifu/Desktop/Weather/WeatherWidget/Info.plist",
-        "/Users/weifu/Desktop/Weather/Weather/Assets.xcassets",
-    ]
-    
-    for file_path in required_files:
+    for file_path in REQUIRED_FILES:
         if os.path.exists(file_path):
             print(f"  ✅ {os.path.basename(file_path)}")
         else:
@@ -88,13 +144,11 @@ def check_assets():
     """检查资源文件"""
     print("\n🔍 检查应用图标...")
     
-    assets_path = "/Users/weifu/Desktop/Weather/Weather/Assets.xcassets/AppIcon.appiconset"
-    
-    if os.path.exists(assets_path):
+    if os.path.exists(APP_ICON_PATH):
         print("  ✅ AppIcon.appiconset 存在")
         
         # 检查是否有图标文件
-        icon_files = [f for f in os.listdir(assets_path) if f.endswith('.png')]
+        icon_files = [f for f in os.listdir(APP_ICON_PATH) if f.endswith('.png')]
         if icon_files:
             print(f"  ✅ 找到 {len(icon_files)} 个图标文件")
         else:
@@ -120,19 +174,78 @@ def generate_action_items():
     for action in actions:
         print(f"  □ {action}")
 
-def main():
+@functools.lru_cache(maxsize=None)
+def project_source_files():
+    """检查依赖的 xcconfig、字符串表和 Swift 源文件；每次运行只遍历一次目录树"""
+    return tuple(project_paths.iter_files(PROJECT_ROOT, (".xcconfig", ".strings", ".swift")))
+
+def effective_settings_inputs():
+    return [PROJECT_FILE_PATH] + [p for p in project_source_files() if p.endswith(".xcconfig")]
+
+def localization_inputs():
+    """本地化检查依赖的文件：字符串表（按 project_paths.is_strings_table 判断）和 Swift 源文件，复用同一次目录遍历"""
+    files = project_source_files()
+    return ([p for p in files if project_paths.is_strings_table(p)] +
+            [p for p in files if p.endswith(".swift")])
+
+# (检查函数, 版本, 返回输入文件列表的函数)
+CHECKS = (
+    (check_info_plist, 1, lambda: [INFO_PLIST_PATH]),
+    (check_project_settings, 1, lambda: [PROJECT_FILE_PATH]),
+    (check_effective_settings, 1, effective_settings_inputs),
+    (check_localization, 1, localization_inputs),
+    (check_required_files, 1, lambda: REQUIRED_FILES),
+    (check_assets, 1, lambda: [APP_ICON_PATH]),
+)
+
+def run_checks(cache=None):
+    """依次运行 CHECKS，返回使用了缓存结果的检查数量"""
+    cached = 0
+    for check, version, inputs in CHECKS:
+        name = check.__name__
+        with instrumentation.span("validate", name):
+            if cache is None:
+                check()
+                continue
+            with instrumentation.span("index", f"{name} inputs"):
+                result, fingerprints = cache.lookup(name, version, inputs())
+            if result is None:
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    check()
+                result = output.getvalue()
+                cache.store(name, version, fingerprints, result)
+            else:
+                cached += 1
+            sys.stdout.write(result)
+    return cached
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="App Store 上架前检查")
+    parser.add_argument("--no-cache", action="store_true", help="不读取也不更新结果缓存")
+    parser.add_argument("--verify", action="store_true", help="总是比较文件内容哈希，不使用 mtime 快速判断")
+    parser.add_argument("--clear-cache", action="store_true", help="清空缓存后重新检查")
+    args = parser.parse_args(argv)
     print("🚀 App Store 上架前检查")
     print("=" * 50)
     
-    check_info_plist()
-    check_project_settings()
-    check_required_files()
-    check_assets()
+    cache = None
+    if not args.no_cache:
+        import check_cache
+
+        cache = check_cache.ResultCache(CACHE_PATH, verify=args.verify)
+        if args.clear_cache:
+            cache.clear()
+    cached = run_checks(cache)
+    if cache is not None:
+        cache.save()
     generate_action_items()
     
     print("\n" + "=" * 50)
     print("✨ 检查完成！请根据上述结果进行必要的修改。")
     print("📖 详细指南请查看: APP_STORE_SUBMISSION_GUIDE.md")
+    if cached:
+        print(f"♻️  {cached}/{len(CHECKS)} 项检查的输入未变化，使用了缓存结果")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
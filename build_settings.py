@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Build Settings 解析引擎
+
+按 Xcode 的层级计算 target 实际使用的 build setting：
+
+  内置变量 (TARGET_NAME、CONFIGURATION 等)
+    < 项目级 xcconfig < 项目级 buildSettings
+    < target 级 xcconfig < target 级 buildSettings
+
+支持 $(VAR) / ${VAR} 引用、嵌套引用、$(inherited)、常用修饰符
+（:lower、:upper、:rfc1034identifier、:c99extidentifier、:default=）
+以及 xcconfig 的 #include。结果按 (target, configuration, key) 缓存，
+计算所有 target 的全部设置总耗时与设置总数成线性关系。
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import instrumentation
+import project_client
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+
+_XCCONFIG_INCLUDE_RE = re.compile(r'^#include(\??)\s+"([^"]+)"')
+_XCCONFIG_ASSIGN_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])*)\s*=\s*(.*?)\s*;?\s*$")
+
+
+class BuildSettingCycleError(ValueError):
+    """变量引用形成循环"""
+
+
+def _strip_comment(line):
+    """去掉 xcconfig 行尾的 // 注释（引号内的除外）"""
+    in_quote = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quote = not in_quote
+        elif ch == "/" and not in_quote and line.startswith("//", i):
+            return line[:i]
+    return line
+
+
+def parse_xcconfig(path, _seen=None):
+    """解析 xcconfig（展开 #include），返回 [(key, value)]，保持定义顺序"""
+    seen = _seen if _seen is not None else set()
+    path = os.path.normpath(path)
+    if path in seen:
+        raise BuildSettingCycleError(f"xcconfig 循环包含: {path}")
+    seen.add(path)
+
+    assignments = []
+    instrumentation.count("xcconfig_files_read")
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            include = _XCCONFIG_INCLUDE_RE.match(line)
+            if include:
+                optional, target = include.groups()
+                target = os.path.join(os.path.dirname(path), target)
+                if optional and not os.path.exists(target):
+                    continue
+                assignments.extend(parse_xcconfig(target, seen))
+                continue
+            line = _strip_comment(line).strip()
+            match = _XCCONFIG_ASSIGN_RE.match(line)
+            if match:
+                assignments.append((match.group(1), match.group(2)))
+    seen.discard(path)
+    return assignments
+
+
+def _apply_modifier(value, modifier):
+    if modifier == "lower":
+        return value.lower()
+    if modifier == "upper":
+        return value.upper()
+    if modifier == "rfc1034identifier":
+        return re.sub(r"[^A-Za-z0-9.-]", "-", value)
+    if modifier == "c99extidentifier":
+        value = re.sub(r"[^A-Za-z0-9_]", "_", value)
+        return "_" + value if value[:1].isdigit() else value
+    if modifier == "base":
+        return os.path.splitext(os.path.basename(value))[0]
+    if modifier == "file":
+        return os.path.basename(value)
+    if modifier == "dir":
+        return os.path.dirname(value)
+    if modifier == "suffix":
+        return os.path.splitext(value)[1]
+    if modifier.startswith("default="):
+        return value or modifier[len("default="):]
+    return value
+
+
+class _Layer:
+    """一层设置：key -> 按定义顺序排列的原始值"""
+
+    def __init__(self, name):
+        self.name = name
+        self.values = {}
+
+    def define(self, key, value):
+        self.values.setdefault(key, []).append(value)
+
+
+class BuildSettingsResolver:
+    """计算某个 target / configuration 的有效 build setting"""
+
+    def __init__(self, graph, source_root=PROJECT_ROOT, project_name="Weather"):
+        self.graph = graph
+        self.source_root = source_root
+        self.project_name = project_name
+        self._stacks = {}
+        self._cache = {}
+        self._xcconfigs = {}
+
+    def preload_xcconfig(self, path, assignments):
+        """预先提供某个 xcconfig 的内容（已展开 #include），不再从磁盘读取"""
+        self._xcconfigs[os.path.normpath(path)] = list(assignments)
+
+    # -- 层级构建 ----------------------------------------------------------
+
+    def _configurations(self, config_list_id):
+        config_list = self.graph.get(config_list_id)
+        if config_list is None:
+            return {}
+        result = {}
+        for config_id in config_list.get("buildConfigurations", ()):
+            config = self.graph.get(config_id)
+            if config is not None:
+                result[config.name] = config
+        return result
+
+    def _xcconfig_layer(self, config, name):
+        ref = config.baseConfigurationReference
+        if not ref:
+            return None
+        path = self.graph.full_path(ref, self.source_root)
+        if path is None:
+            return None
+        path = os.path.normpath(path)
+        if path not in self._xcconfigs:
+            self._xcconfigs[path] = parse_xcconfig(path) if os.path.exists(path) else []
+        layer = _Layer(f"{name} ({os.path.relpath(path, self.source_root)})")
+        for key, value in self._xcconfigs[path]:
+            layer.define(key, value)
+        return layer
+
+    def _settings_layer(self, config, name):
+        layer = _Layer(name)
+        for key, value in (config.buildSettings or {}).items():
+            layer.define(key, value)
+        return layer
+
+    def target(self, target_name):
+        for target in self.graph.targets():
+            if target.name == target_name:
+                return target
+        raise KeyError(f"找不到 target: {target_name}")
+
+    def configuration_names(self, target_name=None):
+        if target_name is None:
+            list_id = self.graph.project().buildConfigurationList
+        else:
+            list_id = self.target(target_name).buildConfigurationList
+        return list(self._configurations(list_id))
+
+    def _stack(self, target_name, configuration):
+        key = (target_name, configuration)
+        stack = self._stacks.get(key)
+        if stack is not None:
+            return stack
+
+        builtins = _Layer("内置变量")
+        builtins.define("CONFIGURATION", configuration)
+        builtins.define("PROJECT_NAME", self.project_name)
+        builtins.define("PROJECT_DIR", self.source_root)
+        builtins.define("SRCROOT", self.source_root)
+        builtins.define("SOURCE_ROOT", self.source_root)
+        stack = [builtins]
+
+        project = self.graph.project()
+        project_config = self._configurations(project.buildConfigurationList).get(configuration)
+        if project_config is not None:
+            stack.append(self._xcconfig_layer(project_config, "项目 xcconfig"))
+            stack.append(self._settings_layer(project_config, "项目"))
+
+        if target_name is not None:
+            target = self.target(target_name)
+            builtins.define("TARGET_NAME", target.name)
+            builtins.define("PRODUCT_TYPE", target.productType or "")
+            target_config = self._configurations(target.buildConfigurationList).get(configuration)
+            if target_config is None:
+                raise KeyError(f"target {target_name} 没有 {configuration} 配置")
+            stack.append(self._xcconfig_layer(target_config, "target xcconfig"))
+            stack.append(self._settings_layer(target_config, "target"))
+
+        stack = [layer for layer in stack if layer is not None]
+        self._stacks[key] = stack
+        self._cache[key] = {}
+        return stack
+
+    # -- 求值 --------------------------------------------------------------
+
+    def resolve(self, target_name, configuration, key):
+        """返回有效值（str 或 list）；没有定义时返回 None"""
+        stack = self._stack(target_name, configuration)
+        cache = self._cache[(target_name, configuration)]
+        instrumentation.count("build_settings.lookups")
+        if key not in cache:
+            instrumentation.count("build_settings.cache_misses")
+            cache[key] = self._resolve_at(stack, cache, len(stack) - 1, None, key, [])
+        return cache[key]
+
+    def _resolve_at(self, stack, cache, layer_index, position, key, chain):
+        """从 stack[layer_index] 的第 position 个定义开始向下查找 key"""
+        frame = (layer_index, position, key)
+        if frame in chain:
+            names = " -> ".join(k for _, _, k in chain[chain.index(frame):] + [frame])
+            raise BuildSettingCycleError(f"build setting 循环引用: {names}")
+
+        while layer_index >= 0:
+            values = stack[layer_index].values.get(key)
+            if values:
+                index = len(values) - 1 if position is None else position
+                if index >= 0:
+                    chain.append(frame)
+                    try:
+                        return self._expand(stack, cache, values[index], layer_index, index, key, chain)
+                    finally:
+                        chain.pop()
+            layer_index -= 1
+            position = None
+        return None
+
+    def _inherited(self, stack, cache, layer_index, index, key, chain):
+        if index > 0:
+            return self._resolve_at(stack, cache, layer_index, index - 1, key, chain)
+        return self._resolve_at(stack, cache, layer_index - 1, None, key, chain)
+
+    def _lookup(self, stack, cache, name, chain):
+        instrumentation.count("build_settings.lookups")
+        if name in cache:
+            return cache[name]
+        instrumentation.count("build_settings.cache_misses")
+        value = self._resolve_at(stack, cache, len(stack) - 1, None, name, chain)
+        cache[name] = value
+        return value
+
+    def _expand(self, stack, cache, value, layer_index, index, key, chain):
+        if isinstance(value, (list, tuple)):
+            result = []
+            for item in value:
+                if item in ("$(inherited)", "${inherited}"):
+                    inherited = self._inherited(stack, cache, layer_index, index, key, chain)
+                    if isinstance(inherited, list):
+                        result.extend(inherited)
+                    elif inherited:
+                        result.extend(inherited.split())
+                else:
+                    result.append(self._expand_string(stack, cache, item, layer_index, index, key, chain))
+            return result
+        return self._expand_string(stack, cache, value, layer_index, index, key, chain)
+
+    def _expand_string(self, stack, cache, text, layer_index, index, key, chain):
+        if "$" not in text:
+            return text
+        out = []
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if ch == "$" and i + 1 < len(text) and text[i + 1] in "({":
+                close = ")" if text[i + 1] == "(" else "}"
+                end = self._matching(text, i + 1, close)
+                if end < 0:
+                    out.append(text[i:])
+                    break
+                inner = self._expand_string(stack, cache, text[i + 2:end], layer_index, index, key, chain)
+                out.append(self._substitute(stack, cache, inner, layer_index, index, key, chain))
+                i = end + 1
+                continue
+            out.append(ch)
+            i += 1
+        return "".join(out)
+
+    @staticmethod
+    def _matching(text, start, close):
+        opening = text[start]
+        depth = 0
+        for i in range(start, len(text)):
+            if text[i] == opening:
+                depth += 1
+            elif text[i] == close:
+                depth -= 1
+                if depth == 0:
+                    return i
+        return -1
+
+    def _substitute(self, stack, cache, reference, layer_index, index, key, chain):
+        name, *modifiers = reference.split(":")
+        if name == "inherited":
+            value = self._inherited(stack, cache, layer_index, index, key, chain)
+        else:
+            value = self._lookup(stack, cache, name, chain)
+        if isinstance(value, list):
+            value = " ".join(value)
+        value = value or ""
+        for modifier in modifiers:
+            value = _apply_modifier(value, modifier)
+        return value
+
+    # -- 汇总 --------------------------------------------------------------
+
+    def setting_keys(self, target_name, configuration):
+        keys = {}
+        for layer in self._stack(target_name, configuration):
+            for key in layer.values:
+                keys[key] = None
+        return sorted(keys)
+
+    def effective_settings(self, target_name, configuration):
+        """返回 {key: 有效值}，包含任意一层中定义过的全部 key"""
+        return {key: self.resolve(target_name, configuration, key)
+                for key in self.setting_keys(target_name, configuration)}
+
+    def source_layer(self, target_name, configuration, key):
+        """返回最终生效的定义所在的层名称"""
+        for layer in reversed(self._stack(target_name, configuration)):
+            if key in layer.values:
+                return layer.name
+        return None
+
+
+def load_resolver(project_path=None, source_root=PROJECT_ROOT):
+    project_path = project_path or project_paths.project_file(source_root)
+    return BuildSettingsResolver(project_client.load_graph(project_path, source_root), source_root,
+                                 project_paths.project_name(project_path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="计算 target 的有效 build setting")
+    parser.add_argument("keys", nargs="*", help="只输出这些 key（默认输出全部）")
+    parser.add_argument("-t", "--target", action="append", help="target 名称，可重复；默认全部 target")
+    parser.add_argument("-c", "--configuration", action="append", help="配置名称，可重复；默认全部配置")
+    parser.add_argument("--show-source", action="store_true", help="显示每个值来自哪一层")
+    args = parser.parse_args(argv)
+
+    resolver = load_resolver()
+    targets = args.target or [t.name for t in resolver.graph.targets()]
+    try:
+        for target in targets:
+            for configuration in args.configuration or resolver.configuration_names(target):
+                print(f"🎯 {target} [{configuration}]")
+                keys = args.keys or resolver.setting_keys(target, configuration)
+                for key in keys:
+                    value = resolver.resolve(target, configuration, key)
+                    if isinstance(value, list):
+                        value = " ".join(value)
+                    source = ""
+                    if args.show_source:
+                        source = f"  ({resolver.source_layer(target, configuration, key) or '未定义'})"
+                    print(f"  {key} = {'' if value is None else value}{source}")
+    except (KeyError, BuildSettingCycleError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+按输入文件内容缓存检查结果
+
+每条记录保存检查版本、输入文件的指纹和检查输出。指纹为
+(mtime_ns, size, sha256)：mtime 和 size 都没变时直接认为未修改；
+否则重新计算内容哈希，内容相同（例如只是 touch 或切换分支）仍然命中，
+并更新记录中的 mtime。目录的“内容”是其中的文件名列表，
+不存在的路径指纹为 None。
+"""
+
+import hashlib
+import json
+import os
+
+import instrumentation
+
+CACHE_VERSION = 1
+
+
+def _digest_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    instrumentation.count("check_cache.bytes_hashed", os.path.getsize(path))
+    return digest.hexdigest()
+
+
+def _digest_dir(path):
+    return hashlib.sha256("\n".join(sorted(os.listdir(path))).encode("utf-8")).hexdigest()
+
+
+def _stat(path):
+    """返回 (mtime_ns, size)；路径不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, 0 if os.path.isdir(path) else st.st_size]
+
+
+def fingerprint(path, stat=None):
+    """返回 [mtime_ns, size, sha256]；路径不存在时返回 None"""
+    stat = stat or _stat(path)
+    if stat is None:
+        return None
+    digest = _digest_dir(path) if os.path.isdir(path) else _digest_file(path)
+    return stat + [digest]
+
+
+class ResultCache:
+    """保存在 JSON 文件中的检查结果缓存"""
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        self.verify = verify        # True 时忽略 mtime 快速判断，总是比较内容哈希
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def clear(self):
+        self.entries = {}
+        self.dirty = True
+
+    def lookup(self, name, version, paths):
+        """返回 (缓存的结果或 None, 当前输入指纹)
+
+        未命中时返回的指纹应在运行检查之前计算，之后原样交给 store()，
+        这样检查运行期间被修改的文件会在下一次重新检查。
+        """
+        entry = self.entries.get(name)
+        recorded = entry.get("inputs", {}) if entry and entry.get("version") == version else None
+        current = {}
+        hit = recorded is not None and set(recorded) == set(paths)
+        for path in paths:
+            stat = _stat(path)
+            old = recorded.get(path) if recorded else None
+            if stat is None:
+                current[path] = None
+                hit = hit and old is None
+            elif old is not None and not self.verify and old[:2] == stat:
+                current[path] = old
+            else:
+                current[path] = fingerprint(path, stat)
+                hit = hit and old is not None and old[2] == current[path][2]
+        if hit:
+            instrumentation.count("check_cache.hits")
+            if current != recorded:
+                # 内容未变但 mtime 变了：记下新的 mtime，下次走快速路径
+                entry["inputs"] = current
+                self.dirty = True
+            return entry["result"], current
+        instrumentation.count("check_cache.misses")
+        return None, current
+
+    def store(self, name, version, inputs, result):
+        self.entries[name] = {"version": version, "inputs": inputs, "result": result}
+        self.dirty = True
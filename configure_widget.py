@@ -3,13 +3,19 @@
 配置 Weather 应用的 Widget Extension
 """
 
+import argparse
 import os
 import plistlib
 import json
 
+import instrumentation
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+
 def update_info_plist():
     """更新主应用的 Info.plist 以支持 App Groups"""
-    info_plist_path = "/Users/weifu/Desktop/Weather/Weather/Info.plist"
+    info_plist_path = os.path.join(PROJECT_ROOT, "Weather", "Info.plist")
     
     try:
         with open(info_plist_path, 'rb') as f:
@@ -57,17 +63,17 @@ def create_entitlements():
 </plist>"""
     
     # 创建权限文件
-    with open("/Users/weifu/Desktop/Weather/Weather/Weather.entitlements", 'w') as f:
+    with open(os.path.join(PROJECT_ROOT, "Weather", "Weather.entitlements"), 'w') as f:
         f.write(app_entitlements)
     
-    with open("/Users/weifu/Desktop/Weather/WeatherWidget/WeatherWidget.entitlements", 'w') as f:
+    with open(os.path.join(PROJECT_ROOT, "WeatherWidget", "WeatherWidget.entitlements"), 'w') as f:
         f.write(widget_entitlements)
     
     print("✅ 已创建权限文件")
 
 def update_widget_data_manager():
     """更新 WidgetDataManager 中的 App Group ID"""
-    manager_path = "/Users/weifu/Desktop/Weather/Weather/Services/WidgetDataManager.swift"
+    manager_path = os.path.join(PROJECT_ROOT, "Weather", "Services", "WidgetDataManager.swift")
     
     try:
         with open(manager_path, 'r') as f:
@@ -89,7 +95,7 @@ def update_widget_data_manager():
 
 def update_widget_swift():
     """更新 WeatherWidget.swift 中的 App Group ID"""
-    widget_path = "/Users/weifu/Desktop/Weather/WeatherWidget/WeatherWidget.swift"
+    widget_path = os.path.join(PROJECT_ROOT, "WeatherWidget", "WeatherWidget.swift")
     
     try:
         with open(widget_path, 'r') as f:
@@ -112,7 +118,7 @@ def update_widget_swift():
 def create_widget_bundle_resources():
     """创建 Widget 所需的资源文件"""
     # 创建 Assets.xcassets 目录
-    assets_path = "/Users/weifu/Desktop/Weather/WeatherWidget/Assets.xcassets"
+    assets_path = os.path.join(PROJECT_ROOT, "WeatherWidget", "Assets.xcassets")
     os.makedirs(assets_path, exist_ok=True)
     
     # 创建 Contents.json
@@ -170,7 +176,7 @@ def create_widget_bundle_resources():
 
 def create_widget_preview_content():
     """创建预览内容"""
-    preview_path = "/Users/weifu/Desktop/Weather/WeatherWidget/Preview Content"
+    preview_path = os.path.join(PROJECT_ROOT, "WeatherWidget", "Preview Content")
     os.makedirs(preview_path, exist_ok=True)
     
     # 创建空的 Contents.json
@@ -202,22 +208,28 @@ def create_widget_bridging_header():
 #endif /* WeatherWidget_Bridging_Header_h */
 """
     
-    with open("/Users/weifu/Desktop/Weather/WeatherWidget/WeatherWidget-Bridging-Header.h", 'w') as f:
+    with open(os.path.join(PROJECT_ROOT, "WeatherWidget", "WeatherWidget-Bridging-Header.h"), 'w') as f:
         f.write(bridging_header)
     
     print("✅ 已创建桥接头文件")
 
-def main():
+def main(argv=None):
+    argparse.ArgumentParser(description="配置 Weather 应用的 Widget Extension").parse_args(argv)
     print("🔧 开始配置 Widget Extension...")
     
     # 执行各项配置
-    update_info_plist()
-    create_entitlements()
-    update_widget_data_manager()
-    update_widget_swift()
-    create_widget_bundle_resources()
-    create_widget_preview_content()
-    create_widget_bridging_header()
+    steps = (
+        update_info_plist,
+        create_entitlements,
+        update_widget_data_manager,
+        update_widget_swift,
+        create_widget_bundle_resources,
+        create_widget_preview_content,
+        create_widget_bridging_header,
+    )
+    for step in steps:
+        with instrumentation.span("write", step.__name__):
+            step()
     
     print("\n✅ Widget Extension 配置完成！")
     print("\n📝 接下来的步骤：")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+把重复的 build setting 提取到共享的 xcconfig 文件
+
+分析所有 target 的 XCBuildConfiguration，把取值完全相同的设置提取到
+Configurations/ 目录下生成的 xcconfig 中：
+
+  Shared.xcconfig                 所有 target 共有
+  <类型>.xcconfig                  同一 productType 的 target 共有（#include Shared）
+  <类型>-<配置>.xcconfig           同类型、同配置共有（#include <类型>）
+
+每个配置的 baseConfigurationReference 指向链条中最具体的那个文件，
+内容为空的文件不会生成。
+改写前后对每个 target / 配置计算有效设置并逐项比较，不一致时放弃修改。
+已经设置了 baseConfigurationReference 的配置不参与提取。
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import build_settings
+import pbx_objects
+import pbxproj
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+CONFIG_DIR = "Configurations"
+_MISSING = object()
+
+HEADER = "// 由 dedupe_build_settings.py 自动生成，请勿手动修改\n"
+
+
+def generate_uuid():
+    """生成 Xcode 使用的 24 字符 UUID"""
+    return uuid.uuid4().hex.upper()[:24]
+
+
+def type_name(product_type):
+    """com.apple.product-type.app-extension -> AppExtension"""
+    name = (product_type or "other").rsplit("product-type.", 1)[-1]
+    return "".join(part.capitalize() for part in name.replace("-", ".").split("."))
+
+
+def _factorable(value):
+    """能否原样写入 xcconfig（xcconfig 中 // 是注释，列表元素不能包含空格）"""
+    if isinstance(value, list):
+        return all(isinstance(v, str) and " " not in v and "//" not in v for v in value)
+    return isinstance(value, str) and "//" not in value and "\n" not in value
+
+
+def _common(members, settings, exclude):
+    """返回在所有 members 中取值相同的设置"""
+    if len(members) < 2:
+        return {}
+    first = settings[members[0]]
+    common = {}
+    for key, value in first.items():
+        if key in exclude or not _factorable(value):
+            continue
+        if all(settings[m].get(key, _MISSING) == value for m in members[1:]):
+            common[key] = value
+    return common
+
+
+def _format_value(value):
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
+
+
+def plan_dedupe(project):
+    """计算提取方案，返回 (文件列表, {配置 ID: 叶子文件名})
+
+    文件列表中的每一项为 (文件名, include 的文件名或 None, {key: value})。
+    """
+    objects = project["objects"]
+    root = objects[project["rootObject"]]
+
+    members = []          # (配置 ID, 类型, 配置名)
+    for target_id in root.get("targets", []):
+        target = objects[target_id]
+        config_list = objects.get(target.get("buildConfigurationList"), {})
+        for config_id in config_list.get("buildConfigurations", []):
+            config = objects[config_id]
+            if config.get("baseConfigurationReference"):
+                continue
+            members.append((config_id, type_name(target.get("productType")), config.get("name")))
+
+    settings = {config_id: objects[config_id].get("buildSettings", {}) for config_id, _, _ in members}
+    all_ids = [m[0] for m in members]
+    shared = _common(all_ids, settings, set())
+
+    by_type = {}
+    for config_id, kind, config_name in members:
+        by_type.setdefault(kind, {}).setdefault(config_name, []).append(config_id)
+
+    # 内容为空的文件不生成，引用它的文件直接 include 上一级
+    files = []
+    shared_file = None
+    if shared:
+        shared_file = "Shared.xcconfig"
+        files.append((shared_file, None, shared))
+    leaf_for = {}
+    for kind, configs in sorted(by_type.items()):
+        type_ids = [cid for ids in configs.values() for cid in ids]
+        type_common = _common(type_ids, settings, shared)
+        type_file = shared_file
+        if type_common:
+            type_file = f"{kind}.xcconfig"
+            files.append((type_file, shared_file, type_common))
+        for config_name, ids in sorted(configs.items()):
+            leaf_common = _common(ids, settings, shared.keys() | type_common.keys())
+            leaf_file = type_file
+            if leaf_common:
+                leaf_file = f"{kind}-{config_name}.xcconfig"
+                files.append((leaf_file, type_file, leaf_common))
+            if leaf_file is not None:
+                for config_id in ids:
+                    leaf_for[config_id] = leaf_file
+    return files, leaf_for
+
+
+def render_xcconfig(include, values):
+    lines = [HEADER]
+    if include:
+        lines.append(f'#include "{include}"\n')
+    if values:
+        lines.append("\n")
+    for key in sorted(values):
+        lines.append(f"{key} = {_format_value(values[key])}\n")
+    return "".join(lines)
+
+
+def parse_rendered(rendered):
+    """把生成的 xcconfig 文本写入临时目录，再用 build_settings.parse_xcconfig 读回
+
+    返回 {文件名: [(key, value)]}（已展开 #include），校验的是实际写入磁盘的内容。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in rendered.items():
+            with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        return {name: build_settings.parse_xcconfig(os.path.join(tmp, name)) for name in rendered}
+
+
+def apply_plan(project, files, leaf_for):
+    """改写项目：删除已提取的设置，添加文件引用并设置 baseConfigurationReference"""
+    objects = project["objects"]
+    root = objects[project["rootObject"]]
+    by_name = {f[0]: f for f in files}
+
+    file_ids = {}
+    for name, _, _ in files:
+        file_id = generate_uuid()
+        file_ids[name] = file_id
+        objects[file_id] = {
+            "isa": "PBXFileReference",
+            "lastKnownFileType": "text.xcconfig",
+            "path": name,
+            "sourceTree": "<group>",
+        }
+    group_id = generate_uuid()
+    objects[group_id] = {
+        "isa": "PBXGroup",
+        "children": [file_ids[name] for name, _, _ in files],
+        "path": CONFIG_DIR,
+        "sourceTree": "<group>",
+    }
+    objects[root["mainGroup"]].setdefault("children", []).insert(0, group_id)
+
+    removed = 0
+    for config_id, leaf in leaf_for.items():
+        config = objects[config_id]
+        factored = set()
+        name = leaf
+        while name:
+            factored.update(by_name[name][2])
+            name = by_name[name][1]
+        build_settings_dict = config.get("buildSettings", {})
+        for key in factored:
+            if key in build_settings_dict:
+                del build_settings_dict[key]
+                removed += 1
+        config["baseConfigurationReference"] = file_ids[leaf]
+    return removed
+
+
+def effective(resolver):
+    """计算全部 target / 配置的有效设置
+
+    列表与字符串统一按空白分隔比较：xcconfig 中的 `$(inherited) a` 在没有
+    继承值时会多出前导空格，但与列表形式 ($(inherited), a) 的构建结果相同。
+    """
+    result = {}
+    for target in resolver.graph.targets():
+        for configuration in resolver.configuration_names(target.name):
+            for key, value in resolver.effective_settings(target.name, configuration).items():
+                if value is not None:
+                    value = " ".join(_format_value(value).split())
+                result[(target.name, configuration, key)] = value
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把重复的 build setting 提取到共享 xcconfig")
+    parser.add_argument("--project", default=project_paths.project_file(PROJECT_ROOT))
+    parser.add_argument("--dry-run", action="store_true", help="只显示提取方案，不修改文件")
+    args = parser.parse_args(argv)
+
+    source_root = os.path.dirname(os.path.dirname(os.path.abspath(args.project)))
+    project_name = project_paths.project_name(args.project)
+
+    with open(args.project, "r", encoding="utf-8") as f:
+        original_text = f.read()
+    project = pbxproj.parse_pbxproj(original_text)
+    files, leaf_for = plan_dedupe(project)
+    if not files:
+        print("✅ 没有可以提取的重复设置")
+        return 0
+
+    before = effective(build_settings.BuildSettingsResolver(
+        pbx_objects.parse_graph(original_text), source_root, project_name))
+    removed = apply_plan(project, files, leaf_for)
+    new_text = pbxproj.dump_pbxproj(project, project_name)
+
+    # 用改写后的项目和生成的 xcconfig 文本重新计算，确认有效设置完全一致
+    rendered = {name: render_xcconfig(include, values) for name, include, values in files}
+    resolver = build_settings.BuildSettingsResolver(pbx_objects.parse_graph(new_text), source_root, project_name)
+    for name, assignments in parse_rendered(rendered).items():
+        resolver.preload_xcconfig(os.path.join(source_root, CONFIG_DIR, name), assignments)
+    after = effective(resolver)
+    if before != after:
+        changed = sorted(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+        print("❌ 提取后有效设置发生变化，已放弃修改：")
+        for target, configuration, key in changed[:20]:
+            print(f"  {target} [{configuration}] {key}: {before.get((target, configuration, key))!r}"
+                  f" -> {after.get((target, configuration, key))!r}")
+        return 1
+
+    print("📋 提取方案：")
+    for name, include, values in files:
+        suffix = f" (#include {include})" if include else ""
+        print(f"  {CONFIG_DIR}/{name}: {len(values)} 项{suffix}")
+    print(f"  从 project.pbxproj 中移除 {removed} 行设置 "
+          f"({len(original_text)} -> {len(new_text)} 字节)")
+    if args.dry_run:
+        return 0
+
+    config_dir = os.path.join(source_root, CONFIG_DIR)
+    os.makedirs(config_dir, exist_ok=True)
+    for name, text in rendered.items():
+        with open(os.path.join(config_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    backup_path = args.project + ".backup"
+    shutil.copyfile(args.project, backup_path)
+    with open(args.project, "w", encoding="utf-8") as f:
+        f.write(new_text)
+    print(f"✅ 已更新项目文件，备份: {backup_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import re
 import uuid
 import plistlib
 
+import instrumentation
+import project_paths
+
 def generate_uuid():
     """Generate a 24-character hex UUID for Xcode"""
     return uuid.uuid4().hex.upper()[:24]
@@ -101,11 +105,14 @@ def update_project_file():
     print(f"📝 Updating {project_file}...")
     
     # Read the current project file
-    with open(project_file, 'r') as f:
-        content = f.read()
+    with instrumentation.span("read", project_file):
+        with open(project_file, 'r') as f:
+            content = f.read()
+    instrumentation.count("bytes_read", len(content.encode("utf-8")))
     
     # Create new structure
-    file_refs, groups, main_group_uuid = create_new_project_structure()
+    with instrumentation.span("index", "swift sources"):
+        file_refs, groups, main_group_uuid = create_new_project_structure()
     
     # Build new content sections
     file_ref_section = "/* Begin PBXFileReference section */\n"
@@ -123,8 +130,10 @@ def update_project_file():
     # For now, let's create a backup and suggest manual steps
     
     backup_file = project_file + '.backup'
-    with open(backup_file, 'w') as f:
-        f.write(content)
+    with instrumentation.span("write", backup_file):
+        with open(backup_file, 'w') as f:
+            f.write(content)
+    instrumentation.count("bytes_written", len(content.encode("utf-8")))
     
     print(f"✅ Created backup: {backup_file}")
     print("\n📋 File structure found:")
@@ -133,6 +142,10 @@ def update_project_file():
     
     return True
 
+def main(argv=None):
+    argparse.ArgumentParser(description="Sync Swift sources into the Xcode project file").parse_args(argv)
+    os.chdir(project_paths.find_project_root())
+    return 0 if update_project_file() else 1
+
 if __name__ == "__main__":
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    update_project_file()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+项目工具的埋点：命名 span、计数器、cProfile 和 Chrome trace 输出
+
+默认关闭，span() / count() 只做一次布尔判断，不影响正常运行。启用方式：
+
+  python3 weathertool.py --profile[=前缀] <子命令> ...
+  WEATHER_TOOL_PROFILE=前缀 python3 weathertool.py <子命令> ...   # CI 中使用
+
+结束时写出 <前缀>.pstats（cProfile 数据，可用 python3 -m pstats 查看）和
+<前缀>.trace.json（Chrome trace 格式，可在 chrome://tracing 或 Perfetto 中打开），
+并在标准错误输出各阶段耗时和计数器。前缀为空或为 1 时使用
+profile/weathertool-<子命令>。
+
+span 按阶段分类：read / parse / index / mutate / validate / write。
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "WEATHER_TOOL_PROFILE"
+DEFAULT_PROFILE_DIR = "profile"
+PHASES = ("read", "parse", "index", "mutate", "validate", "write")
+
+_enabled = False
+_origin_ns = 0
+_spans = []           # (阶段, 名称, 开始 ns, 耗时 ns, 线程 ID, 附加参数)
+_counters = {}
+_lock = threading.Lock()
+
+
+def enable():
+    """开始记录 span 和计数器"""
+    global _enabled, _origin_ns
+    if not _enabled:
+        _origin_ns = time.perf_counter_ns()
+        _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """清空已记录的数据"""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("phase", "name", "args", "start")
+
+    def __init__(self, phase, name, args):
+        self.phase = phase
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        with _lock:
+            _spans.append((self.phase, self.name, self.start, duration, threading.get_ident(), self.args))
+        return False
+
+
+def span(phase, name=None, **args):
+    """记录一个阶段的耗时：with span("parse", "project.pbxproj"): ..."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(phase, name or phase, args)
+
+
+def count(name, n=1):
+    """累加计数器，例如 count("bytes_read", len(data))"""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def span_totals():
+    """按 (阶段, 名称) 汇总，返回 [(阶段, 名称, 次数, 总耗时 ns)]，耗时从大到小"""
+    totals = {}
+    with _lock:
+        for phase, name, _, duration, _, _ in _spans:
+            entry = totals.setdefault((phase, name), [0, 0])
+            entry[0] += 1
+            entry[1] += duration
+    return sorted(((phase, name, n, ns) for (phase, name), (n, ns) in totals.items()),
+                  key=lambda item: -item[3])
+
+
+def chrome_trace():
+    """转换为 Chrome trace event 格式"""
+    pid = os.getpid()
+    with _lock:
+        spans = list(_spans)
+        values = dict(_counters)
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+               "args": {"name": os.path.basename(sys.argv[0]) or "python"}}]
+    end_us = 0.0
+    for phase, name, start, duration, tid, args in spans:
+        ts = (start - _origin_ns) / 1000
+        end_us = max(end_us, ts + duration / 1000)
+        events.append({"name": name, "cat": phase, "ph": "X", "ts": ts, "dur": duration / 1000,
+                       "pid": pid, "tid": tid, "args": args})
+    for name, value in sorted(values.items()):
+        events.append({"name": name, "ph": "C", "ts": end_us, "pid": pid, "tid": 0,
+                       "args": {"value": value}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f, ensure_ascii=False)
+
+
+def print_summary(out=None):
+    out = out or sys.stderr
+    totals = span_totals()
+    if totals:
+        out.write("⏱  阶段耗时:\n")
+        for phase, name, n, ns in totals:
+            label = phase if name == phase else f"{phase}:{name}"
+            out.write(f"  {label:<48} {n:>6} 次 {ns / 1e6:>10.2f} ms\n")
+    values = counters()
+    if values:
+        out.write("🔢 计数器:\n")
+        for name, value in sorted(values.items()):
+            out.write(f"  {name:<48} {value:>12}\n")
+
+
+def profile_prefix(value, command):
+    """把 --profile / 环境变量的取值转换为输出文件前缀"""
+    if not value or value == "1":
+        return os.path.join(DEFAULT_PROFILE_DIR, f"weathertool-{command}")
+    return value
+
+
+@contextmanager
+def profile_session(prefix, name="run", top=20):
+    """在 cProfile 下运行，结束时写出 pstats、Chrome trace 和汇总"""
+    import cProfile
+    import pstats
+
+    enable()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        with span("run", name):
+            yield
+    finally:
+        profiler.disable()
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(prefix + ".pstats")
+        write_chrome_trace(prefix + ".trace.json")
+
+        sys.stderr.write("\n")
+        print_summary()
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(top)
+        sys.stderr.write(f"📊 已写出 {prefix}.pstats 和 {prefix}.trace.json\n")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+本地化一致性检查
+
+收集两类字符串表：
+  *.lproj/*.strings       按 OpenStep plist 语法解析（UTF-8 / UTF-16、注释、转义）
+  LanguageManager.swift   LocalizedText 使用的内置字典，每个 AppLanguage 一个 locale
+
+Swift 源文件在线程池中并行扫描，记录 LocalizedText.get / LocalizedTextView /
+NSLocalizedString / String(localized:) 的 key，以及所有字符串字面量
+（cityKey 等动态 key 以字面量形式出现在别处）。按表和 locale 报告：
+
+  缺失      代码中显式查找、或其它 locale 中存在而本 locale 没有的 key
+  未使用    没有以任何字符串字面量出现在所属 bundle 代码中的 key
+  格式不一致 与开发语言（en）的格式说明符（%@、%d、%1$@ …）不一致的 key
+
+  python3 localization_check.py [--jobs N] [--verbose]
+"""
+
+import argparse
+import codecs
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+import pbxproj
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+DEVELOPMENT_LANGUAGE = "en"
+
+# 代码内置的字符串表：(bundle 目录, 文件)
+SWIFT_TABLES = [("Weather", os.path.join("Weather", "Services", "LanguageManager.swift"))]
+
+# 这些表的 key 来自 Info.plist 等非代码位置，不做未使用检查
+NON_CODE_TABLES = {"InfoPlist"}
+
+_LOOKUP_RE = re.compile(r'''
+    (?P<api>LocalizedText\.get|LocalizedTextView|NSLocalizedString|String\(localized:|Text)
+    \(?\s*"(?P<key>(?:[^"\\\n]|\\.)*)"
+''', re.VERBOSE)
+_LITERAL_RE = re.compile(r'"((?:[^"\\\n]|\\.)*)"')
+# 只作为弱引用的 API（SwiftUI 的 Text 字面量既可能是 key 也可能是普通文本）
+_WEAK_APIS = {"Text"}
+
+_FORMAT_RE = re.compile(r"%(?:(\d+)\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?(hh|h|ll|l|q|z|t|j|L)?([@dDiuUxXoOfFeEgGcCsSpaA%])")
+_FORMAT_ALIASES = {"i": "d", "D": "d", "U": "u", "O": "o", "F": "f"}
+
+_LANGUAGE_CASE_RE = re.compile(r'case\s+(\w+)\s*=\s*"([^"]+)"')
+_SWIFT_TABLE_RE = re.compile(r"static\s+let\s+\w+\s*:\s*\[AppLanguage\s*:\s*\[String\s*:\s*String\]\]\s*=\s*\[")
+_SWIFT_SECTION_RE = re.compile(r"^\s*\.(\w+)\s*:\s*\[\s*$", re.MULTILINE)
+_SWIFT_ENTRY_RE = re.compile(r'"((?:[^"\\\n]|\\.)*)"\s*:\s*"((?:[^"\\\n]|\\.)*)"')
+
+
+class StringTable:
+    """某个 bundle 中某张表在一个 locale 下的内容"""
+
+    def __init__(self, bundle, table, locale, path, entries):
+        self.bundle = bundle
+        self.table = table
+        self.locale = locale
+        self.path = path
+        self.entries = entries
+
+
+class TableReport:
+    """一张表（所有 locale）的检查结果"""
+
+    def __init__(self, bundle, table, reference):
+        self.bundle = bundle
+        self.table = table
+        self.reference = reference
+        self.locales = []
+        self.missing = {}        # locale -> [key]
+        self.unused = []         # 所有 locale 中都没有被引用的 key
+        self.mismatched = {}     # locale -> [(key, 参考说明符, 本 locale 说明符)]
+
+    @property
+    def name(self):
+        return f"{self.bundle}/{self.table}"
+
+    def has_errors(self):
+        return any(self.missing.values()) or any(self.mismatched.values())
+
+
+# ---------------------------------------------------------------------------
+# 字符串表
+# ---------------------------------------------------------------------------
+
+def decode_strings(data):
+    """按 BOM（或 UTF-16 的零字节特征）识别编码"""
+    if data.startswith(codecs.BOM_UTF16_LE) or data.startswith(codecs.BOM_UTF16_BE):
+        return data.decode("utf-16")
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode("utf-8")
+    if len(data) >= 2 and data[0] != 0 and data[1] == 0:
+        return data.decode("utf-16-le")
+    if len(data) >= 2 and data[0] == 0 and data[1] != 0:
+        return data.decode("utf-16-be")
+    return data.decode("utf-8")
+
+
+def parse_strings(path):
+    """解析 .strings 文件，返回 {key: value}
+
+    .strings 是没有外层花括号的 OpenStep plist 字典，直接复用 pbxproj 的解析器。
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    instrumentation.count("bytes_read", len(data))
+    entries = pbxproj.parse_object_entries(decode_strings(data))
+    return {key: value for key, value in entries.items() if isinstance(value, str)}
+
+
+def _swift_unescape(value):
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+
+def parse_swift_table(path):
+    """解析 LanguageManager.swift 中的 [AppLanguage: [String: String]] 字典
+
+    返回 {locale: {key: value}}，locale 取 AppLanguage 的 rawValue。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    instrumentation.count("bytes_read", len(text.encode("utf-8")))
+    raw_values = dict(_LANGUAGE_CASE_RE.findall(text))
+
+    start = _SWIFT_TABLE_RE.search(text)
+    if start is None:
+        return {}
+    sections = list(_SWIFT_SECTION_RE.finditer(text, start.end()))
+    tables = {}
+    for i, section in enumerate(sections):
+        end = sections[i + 1].start() if i + 1 < len(sections) else len(text)
+        entries = {}
+        for m in _SWIFT_ENTRY_RE.finditer(text, section.end(), end):
+            entries[_swift_unescape(m.group(1))] = _swift_unescape(m.group(2))
+        tables[raw_values.get(section.group(1), section.group(1))] = entries
+    return tables
+
+
+def format_specifiers(value):
+    """返回格式说明符列表（按参数位置排序），例如 '%1$@ %2$d' -> ['@', 'd']"""
+    specs = []
+    for m in _FORMAT_RE.finditer(value):
+        position, length, conversion = m.groups()
+        if conversion == "%":
+            continue
+        conversion = _FORMAT_ALIASES.get(conversion, conversion)
+        specs.append((int(position) if position else len(specs) + 1, (length or "") + conversion))
+    return [spec for _, spec in sorted(specs)]
+
+
+# ---------------------------------------------------------------------------
+# 扫描
+# ---------------------------------------------------------------------------
+
+def _walk(root):
+    """返回 (.strings 文件列表, .swift 文件列表)，路径相对于 root"""
+    strings_files = []
+    swift_files = []
+    for path in project_paths.iter_files(root, (".strings", ".swift")):
+        relpath = os.path.relpath(path, root)
+        if path.endswith(".swift"):
+            swift_files.append(relpath)
+        elif project_paths.is_strings_table(path):
+            strings_files.append(relpath)
+    return sorted(strings_files), sorted(swift_files)
+
+
+def _bundle_of(relpath):
+    return relpath.split(os.sep, 1)[0]
+
+
+def scan_swift_file(path):
+    """返回 ([(api, key)], {字符串字面量})"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    instrumentation.count("bytes_read", len(text.encode("utf-8")))
+    lookups = [(m.group("api"), m.group("key")) for m in _LOOKUP_RE.finditer(text)]
+    literals = {m.group(1) for m in _LITERAL_RE.finditer(text) if "\\(" not in m.group(1)}
+    instrumentation.count("regex.localization_matches", len(lookups) + len(literals))
+    return lookups, literals
+
+
+def load_tables(root, strings_files):
+    """读取所有字符串表，返回 ([StringTable], [(路径, 错误)])"""
+    tables = []
+    errors = []
+    for relpath in strings_files:
+        parts = relpath.split(os.sep)
+        locale = parts[-2][:-len(".lproj")]
+        table = os.path.splitext(parts[-1])[0]
+        try:
+            entries = parse_strings(os.path.join(root, relpath))
+        except (UnicodeDecodeError, pbxproj.PBXParseError) as e:
+            errors.append((relpath, str(e)))
+            continue
+        tables.append(StringTable(_bundle_of(relpath), table, locale, relpath, entries))
+
+    for bundle, relpath in SWIFT_TABLES:
+        path = os.path.join(root, relpath)
+        if not os.path.exists(path):
+            continue
+        table = os.path.splitext(os.path.basename(relpath))[0]
+        for locale, entries in parse_swift_table(path).items():
+            tables.append(StringTable(bundle, table, locale, relpath, entries))
+    return tables, errors
+
+
+def _reference_locale(locales):
+    for locale in locales:
+        if locale.replace("_", "-").split("-")[0] == DEVELOPMENT_LANGUAGE:
+            return locale
+    return locales[0]
+
+
+def check_tables(tables, usages):
+    """usages: {bundle: (显式查找的 key 集合, 字面量集合)}，返回 [TableReport]"""
+    grouped = {}
+    for table in tables:
+        grouped.setdefault((table.bundle, table.table), {})[table.locale] = table
+
+    reports = []
+    for (bundle, table_name), by_locale in sorted(grouped.items()):
+        locales = sorted(by_locale)
+        reference = _reference_locale(locales)
+        report = TableReport(bundle, table_name, reference)
+        report.locales = locales
+
+        looked_up, literals = usages.get(bundle, (set(), set()))
+        all_keys = set()
+        for table in by_locale.values():
+            all_keys.update(table.entries)
+        # 显式查找的 key 只与本 bundle 中名为 Localizable 或代码内置的表比较
+        expected = all_keys | (looked_up if table_name in ("Localizable", "LanguageManager") else set())
+
+        for locale in locales:
+            keys = by_locale[locale].entries.keys()
+            report.missing[locale] = sorted(expected - keys)
+
+        if table_name not in NON_CODE_TABLES:
+            report.unused = sorted(all_keys - literals - looked_up)
+
+        reference_entries = by_locale[reference].entries
+        reference_specs = {key: format_specifiers(value) for key, value in reference_entries.items()}
+        for locale in locales:
+            if locale == reference:
+                continue
+            mismatched = []
+            entries = by_locale[locale].entries
+            for key in sorted(entries.keys() & reference_entries.keys()):
+                specs = format_specifiers(entries[key])
+                if specs != reference_specs[key]:
+                    mismatched.append((key, reference_specs[key], specs))
+            report.mismatched[locale] = mismatched
+        reports.append(report)
+    return reports
+
+
+def check_project(root=PROJECT_ROOT, jobs=None):
+    """扫描整个项目，返回 ([TableReport], [(路径, 错误)])"""
+    with instrumentation.span("index", "localization files"):
+        strings_files, swift_files = _walk(root)
+
+    table_files = {relpath for _, relpath in SWIFT_TABLES}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        with instrumentation.span("parse", "swift sources"):
+            scans = list(pool.map(scan_swift_file, [os.path.join(root, p) for p in swift_files]))
+        with instrumentation.span("parse", "string tables"):
+            tables, errors = load_tables(root, strings_files)
+    instrumentation.count("localization.swift_files", len(swift_files))
+    instrumentation.count("localization.tables", len(tables))
+
+    usages = {}
+    for relpath, (lookups, literals) in zip(swift_files, scans):
+        looked_up, seen = usages.setdefault(_bundle_of(relpath), (set(), set()))
+        looked_up.update(key for api, key in lookups if api not in _WEAK_APIS and "\\(" not in key)
+        if relpath not in table_files:
+            # 字典本身的 key 也是字面量，不能算作使用
+            seen.update(literals)
+
+    with instrumentation.span("validate", "localization"):
+        return check_tables(tables, usages), errors
+
+
+def _show_specifiers(specs):
+    return " ".join("%" + spec for spec in specs) or "无"
+
+
+def _preview(keys, limit=8):
+    shown = ", ".join(keys[:limit])
+    return shown + (f" … 共 {len(keys)} 个" if len(keys) > limit else "")
+
+
+def print_report(reports, errors, verbose=False, indent="  "):
+    """输出检查结果，返回是否存在缺失或格式不一致"""
+    failed = bool(errors)
+    for path, message in errors:
+        print(f"{indent}❌ 无法解析 {path}: {message}")
+    for report in reports:
+        print(f"{indent}{'❌' if report.has_errors() else '✅'} {report.name} "
+              f"({', '.join(report.locales)}，参考 {report.reference})")
+        for locale in report.locales:
+            missing = report.missing.get(locale, [])
+            if missing:
+                print(f"{indent}  ❌ {locale} 缺少 {len(missing)} 个 key: "
+                      f"{', '.join(missing) if verbose else _preview(missing)}")
+            for key, expected, actual in report.mismatched.get(locale, []):
+                print(f"{indent}  ❌ {locale} 格式说明符不一致 {key}: "
+                      f"{_show_specifiers(expected)} -> {_show_specifiers(actual)}")
+        if report.unused:
+            print(f"{indent}  ⚠️  {len(report.unused)} 个 key 未在代码中使用: "
+                  f"{', '.join(report.unused) if verbose else _preview(report.unused)}")
+        failed = failed or report.has_errors()
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查字符串表与 Swift 代码中的本地化 key 是否一致")
+    parser.add_argument("--jobs", type=int, default=None, help="扫描 Swift 文件的线程数")
+    parser.add_argument("-v", "--verbose", action="store_true", help="列出全部 key")
+    args = parser.parse_args(argv)
+
+    print("🔍 检查本地化...")
+    reports, errors = check_project(PROJECT_ROOT, args.jobs)
+    if not reports and not errors:
+        print("  ⚠️  没有找到字符串表")
+        return 0
+    return 1 if print_report(reports, errors, args.verbose) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+project.pbxproj 的紧凑对象模型
+
+每种 isa 对应一个使用 __slots__ 的类，不再为每个对象保留一个 dict；
+key、isa、对象 ID 和常见取值在解析时被 intern，子对象列表保存为 tuple。
+未在类中声明的字段放在 extra 中，保证信息不丢失。
+"""
+
+import os
+import sys
+
+import instrumentation
+import pbxproj
+
+
+def _compact(value):
+    """把解析结果转换为紧凑形式：list -> tuple，dict 的 key 做 intern"""
+    if isinstance(value, list):
+        return tuple(_compact(v) for v in value)
+    if isinstance(value, dict):
+        return {sys.intern(k): _compact(v) for k, v in value.items()}
+    return value
+
+
+def _expand(value):
+    """_compact 的逆操作，用于序列化和 JSON 输出"""
+    if isinstance(value, tuple):
+        return [_expand(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    return value
+
+
+class PBXObject:
+    """所有对象的基类；未知 isa 的字段全部保存在 extra 中"""
+
+    __slots__ = ("id", "isa", "extra")
+    FIELDS = ()
+
+    def __init__(self, object_id, isa, values):
+        self.id = object_id
+        self.isa = isa
+        self.extra = None
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        for key, value in values.items():
+            if key == "isa":
+                continue
+            value = _compact(value)
+            if key in self.FIELDS:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[sys.intern(key)] = value
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        if key == "isa":
+            return self.isa
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def to_dict(self):
+        """还原为 pbxproj.parse_pbxproj 输出的 dict 形式（isa 在前，其余按 key 排序）"""
+        values = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                values[field] = _expand(value)
+        if self.extra is not None:
+            for key, value in self.extra.items():
+                values[key] = _expand(value)
+        result = {"isa": self.isa}
+        for key in sorted(values):
+            result[key] = values[key]
+        return result
+
+    def __repr__(self):
+        return f"<{self.isa} {self.id}>"
+
+
+def _define(isa, fields, base=PBXObject):
+    cls = type(isa, (base,), {"__slots__": tuple(fields), "FIELDS": base.FIELDS + tuple(fields)})
+    OBJECT_CLASSES[isa] = cls
+    return cls
+
+
+OBJECT_CLASSES = {}
+
+PBXBuildFile = _define("PBXBuildFile", ("fileRef", "productRef", "settings"))
+PBXFileReference = _define("PBXFileReference", (
+    "explicitFileType", "fileEncoding", "includeInIndex", "lastKnownFileType", "name", "path", "sourceTree",
+))
+PBXGroup = _define("PBXGroup", ("children", "name", "path", "sourceTree"))
+PBXVariantGroup = _define("PBXVariantGroup", (), PBXGroup)
+XCVersionGroup = _define("XCVersionGroup", ("currentVersion", "versionGroupType"), PBXGroup)
+PBXFileSystemSynchronizedRootGroup = _define("PBXFileSystemSynchronizedRootGroup", (
+    "exceptions", "explicitFileTypes", "explicitFolders", "path", "sourceTree",
+))
+PBXFileSystemSynchronizedBuildFileExceptionSet = _define(
+    "PBXFileSystemSynchronizedBuildFileExceptionSet", ("membershipExceptions", "target"),
+)
+
+_BuildPhase = type("_BuildPhase", (PBXObject,), {
+    "__slots__": ("buildActionMask", "files", "runOnlyForDeploymentPostprocessing"),
+    "FIELDS": ("buildActionMask", "files", "runOnlyForDeploymentPostprocessing"),
+})
+PBXSourcesBuildPhase = _define("PBXSourcesBuildPhase", (), _BuildPhase)
+PBXResourcesBuildPhase = _define("PBXResourcesBuildPhase", (), _BuildPhase)
+PBXFrameworksBuildPhase = _define("PBXFrameworksBuildPhase", (), _BuildPhase)
+PBXHeadersBuildPhase = _define("PBXHeadersBuildPhase", (), _BuildPhase)
+PBXCopyFilesBuildPhase = _define("PBXCopyFilesBuildPhase", ("dstPath", "dstSubfolderSpec", "name"), _BuildPhase)
+PBXShellScriptBuildPhase = _define("PBXShellScriptBuildPhase", (
+    "inputPaths", "name", "outputPaths", "shellPath", "shellScript",
+), _BuildPhase)
+
+PBXNativeTarget = _define("PBXNativeTarget", (
+    "buildConfigurationList", "buildPhases", "buildRules", "dependencies", "fileSystemSynchronizedGroups",
+    "name", "packageProductDependencies", "productName", "productReference", "productType",
+))
+PBXAggregateTarget = _define("PBXAggregateTarget", (
+    "buildConfigurationList", "buildPhases", "dependencies", "name", "productName",
+))
+PBXProject = _define("PBXProject", (
+    "attributes", "buildConfigurationList", "compatibilityVersion", "developmentRegion", "hasScannedForEncodings",
+    "knownRegions", "mainGroup", "productRefGroup", "projectDirPath", "projectRoot", "targets",
+))
+PBXTargetDependency = _define("PBXTargetDependency", ("target", "targetProxy"))
+PBXContainerItemProxy = _define("PBXContainerItemProxy", (
+    "containerPortal", "proxyType", "remoteGlobalIDString", "remoteInfo",
+))
+XCBuildConfiguration = _define("XCBuildConfiguration", ("baseConfigurationReference", "buildSettings", "name"))
+XCConfigurationList = _define("XCConfigurationList", (
+    "buildConfigurations", "defaultConfigurationIsVisible", "defaultConfigurationName",
+))
+
+
+def make_object(object_id, values):
+    """根据 isa 创建对应的对象"""
+    isa = sys.intern(values.get("isa", "PBXObject"))
+    cls = OBJECT_CLASSES.get(isa, PBXObject)
+    return cls(object_id, isa, values)
+
+
+class ObjectGraph:
+    """解析后的项目对象图"""
+
+    def __init__(self, project):
+        self.objects = project.pop("objects", {})
+        self.root_object = project.get("rootObject")
+        # archiveVersion、objectVersion、classes 等顶层字段
+        self.header = project
+        self._by_isa = None
+        self._parents = None
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __getitem__(self, object_id):
+        return self.objects[object_id]
+
+    def get(self, object_id):
+        return self.objects.get(object_id)
+
+    def by_isa(self, isa):
+        """返回某种 isa 的全部对象（索引在首次调用时建立）"""
+        if self._by_isa is None:
+            index = {}
+            with instrumentation.span("index", "by_isa"):
+                for obj in self.objects.values():
+                    index.setdefault(obj.isa, []).append(obj)
+            self._by_isa = index
+        return self._by_isa.get(isa, [])
+
+    def project(self):
+        return self.objects.get(self.root_object)
+
+    def targets(self):
+        """按 PBXProject.targets 的顺序返回 target 对象"""
+        project = self.project()
+        if project is None or project.targets is None:
+            return []
+        return [self.objects[t] for t in project.targets if t in self.objects]
+
+    def parents(self):
+        """返回 {子对象 ID: 所在 group}（索引在首次调用时建立）"""
+        if self._parents is None:
+            parents = {}
+            with instrumentation.span("index", "parents"):
+                for obj in self.objects.values():
+                    if isinstance(obj, PBXGroup) and obj.children:
+                        for child in obj.children:
+                            parents[child] = obj
+            self._parents = parents
+        return self._parents
+
+    def full_path(self, object_id, source_root, cache=None):
+        """按 sourceTree 规则解析文件引用或 group 在磁盘上的路径；无法解析时返回 None
+
+        批量解析时传入同一个 cache dict，每个 group 的路径只计算一次。
+        """
+        return self._full_path(object_id, source_root, {} if cache is None else cache)
+
+    def _full_path(self, object_id, source_root, cache):
+        if object_id in cache:
+            return cache[object_id]
+        obj = self.objects.get(object_id)
+        if obj is None:
+            return None
+        path = obj.get("path", "")
+        tree = obj.get("sourceTree", "<group>")
+        if tree == "<absolute>":
+            return path
+        if tree == "SOURCE_ROOT":
+            return os.path.join(source_root, path)
+        if tree != "<group>":
+            # BUILT_PRODUCTS_DIR、SDKROOT 等构建期路径
+            return None
+        parent = self.parents().get(object_id)
+        if parent is None:
+            result = os.path.join(source_root, path)
+        else:
+            parent_path = self._full_path(parent.id, source_root, cache)
+            result = None if parent_path is None else os.path.normpath(os.path.join(parent_path, path))
+        cache[object_id] = result
+        return result
+
+    def to_dict(self):
+        """还原为 pbxproj.parse_pbxproj 的输出形式"""
+        result = dict(self.header)
+        result["objects"] = {oid: obj.to_dict() for oid, obj in self.objects.items()}
+        return result
+
+
+def parse_graph(text):
+    return ObjectGraph(pbxproj.parse_pbxproj(text, object_factory=make_object, intern=True))
+
+
+def graph_from_dict(data):
+    """由 ObjectGraph.to_dict() 的输出（例如常驻进程返回的 JSON）重建对象图"""
+    project = dict(data)
+    project["objects"] = {sys.intern(oid): make_object(sys.intern(oid), values)
+                          for oid, values in data.get("objects", {}).items()}
+    return ObjectGraph(project)
+
+
+def load_graph(path=pbxproj.DEFAULT_PROJECT_PATH):
+    """读取 project.pbxproj 并构建紧凑对象图"""
+    with instrumentation.span("read", path):
+        with open(path, "rb") as f:
+            data = f.read()
+    instrumentation.count("bytes_read", len(data))
+    return parse_graph(data.decode("utf-8"))
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+project.pbxproj 解析器
+
+project.pbxproj 是 OpenStep 格式的 plist：字典 { key = value; }、
+数组 ( a, b, )、带引号或不带引号的字符串，以及 /* */ 注释。
+解析结果是普通的 dict / list / str。
+
+只读工具可以使用 LazyProject：通过 mmap 映射文件，一次扫描建立
+`/* Begin X section */` 的偏移索引，只在访问时解析对应的 section。
+"""
+
+import mmap
+import re
+import sys
+
+import instrumentation
+import project_paths
+
+DEFAULT_PROJECT_PATH = project_paths.project_file()
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:(?:/\*.*?\*/|//[^\n]*)\s*)*
+    (?:
+        (?P<punct>[{}();=,])
+      | "(?P<quoted>(?:[^"\\]|\\.)*)"
+      | <(?P<data>[0-9A-Fa-f\s]*)>
+      | (?P<bare>(?:[^\s{}();=,"/]|/(?![*/]))+)
+      | (?P<end>\Z)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_SECTION_RE = re.compile(rb"/\* (Begin|End) (\w+) section \*/")
+_ROOT_OBJECT_RE = re.compile(rb"rootObject = ([0-9A-Za-z]+)")
+
+_INTERN_MAX_LENGTH = 128
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "'": "'", "0": "\0"}
+
+
+class PBXParseError(ValueError):
+    """project.pbxproj 格式错误"""
+
+
+def _unescape(value):
+    if "\\" not in value:
+        return value
+    out = []
+    i = 0
+    while i < len(value):
+        ch = value[i]
+        if ch == "\\" and i + 1 < len(value):
+            nxt = value[i + 1]
+            if nxt == "U" and i + 5 < len(value):
+                digits = value[i + 2:i + 6]
+                try:
+                    out.append(chr(int(digits, 16)))
+                except ValueError:
+                    raise PBXParseError(f"无效的 \\U 转义: \\U{digits}") from None
+                i += 6
+                continue
+            out.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _tokenize(text, pos=0, endpos=None, intern=False):
+    """生成 (kind, value, offset) 序列，跳过空白与注释
+
+    intern=True 时对较短的字符串调用 sys.intern，重复出现的 key、isa、
+    对象 ID 和常见取值在内存中只保留一份。
+    """
+    if endpos is None:
+        endpos = len(text)
+    for m in _TOKEN_RE.finditer(text, pos, endpos):
+        if m.start() != pos:
+            raise PBXParseError(f"无法识别的内容，位置 {pos}: {text[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "punct":
+            yield m.group("punct"), None, m.start(kind)
+            continue
+        if kind == "end":
+            return
+        if kind == "quoted":
+            value = _unescape(m.group("quoted"))
+        elif kind == "bare":
+            value = m.group("bare")
+        else:
+            value = "<" + m.group("data") + ">"
+        if intern and len(value) <= _INTERN_MAX_LENGTH:
+            value = sys.intern(value)
+        yield "str", value, m.start(kind)
+
+
+def _counted(tokens):
+    """启用埋点时包装 _tokenize，统计正则匹配出的 token 数"""
+    matches = 0
+    try:
+        for token in tokens:
+            matches += 1
+            yield token
+    finally:
+        instrumentation.count("pbxproj.token_matches", matches)
+
+
+def _tokens(text, pos=0, endpos=None, intern=False):
+    tokens = _tokenize(text, pos, endpos, intern)
+    return _counted(tokens) if instrumentation.is_enabled() else tokens
+
+
+_EOF = ("eof", None, -1)
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self._tokens = tokens
+
+    def _next(self):
+        return next(self._tokens, _EOF)
+
+    def _expect(self, kind):
+        token = next(self._tokens, _EOF)
+        if token[0] != kind:
+            raise PBXParseError(f"期望 {kind!r}，实际为 {token[0]!r}，位置 {token[2]}")
+        return token
+
+    def parse_value(self, token=None):
+        kind, value, offset = token or next(self._tokens, _EOF)
+        if kind == "str":
+            return value
+        if kind == "{":
+            return self.parse_dict_items("}")
+        if kind == "(":
+            return self._parse_array()
+        raise PBXParseError(f"意外的 {kind!r}，位置 {offset}")
+
+    def parse_dict_items(self, end, object_factory=None):
+        """解析 key = value; 序列，直到遇到并消费 end
+
+        指定 object_factory 时，每个 value 经 object_factory(key, value) 转换后保存。
+        """
+        tokens = self._tokens
+        result = {}
+        while True:
+            kind, key, offset = next(tokens, _EOF)
+            if kind == end:
+                return result
+            if kind != "str":
+                raise PBXParseError(f"期望字典 key，实际为 {kind!r}，位置 {offset}")
+            token = next(tokens, _EOF)
+            if token[0] != "=":
+                raise PBXParseError(f"期望 '='，实际为 {token[0]!r}，位置 {token[2]}")
+            token = next(tokens, _EOF)
+            value = token[1] if token[0] == "str" else self.parse_value(token)
+            result[key] = value if object_factory is None else object_factory(key, value)
+            token = next(tokens, _EOF)
+            if token[0] != ";":
+                raise PBXParseError(f"期望 ';'，实际为 {token[0]!r}，位置 {token[2]}")
+
+    def _parse_array(self):
+        tokens = self._tokens
+        result = []
+        while True:
+            token = next(tokens, _EOF)
+            if token[0] == ")":
+                return result
+            result.append(token[1] if token[0] == "str" else self.parse_value(token))
+            kind, _, offset = next(tokens, _EOF)
+            if kind == ")":
+                return result
+            if kind != ",":
+                raise PBXParseError(f"期望 ',' 或 ')'，实际为 {kind!r}，位置 {offset}")
+
+
+def parse_pbxproj(text, object_factory=None, intern=False):
+    """解析完整的 project.pbxproj 文本，返回顶层 dict
+
+    指定 object_factory(object_id, dict) 时，objects 中的每个对象在解析完成后
+    立即交给它转换，避免整个文件的 dict 表示同时驻留内存。
+    """
+    with instrumentation.span("parse", "project.pbxproj"):
+        parser = _Parser(_tokens(text, intern=intern))
+        if object_factory is None:
+            result = parser.parse_value()
+            if not isinstance(result, dict):
+                raise PBXParseError("顶层对象必须是字典")
+        else:
+            parser._expect("{")
+            result = {}
+            while True:
+                kind, key, offset = parser._next()
+                if kind == "}":
+                    break
+                if kind != "str":
+                    raise PBXParseError(f"期望字典 key，实际为 {kind!r}，位置 {offset}")
+                parser._expect("=")
+                if key == "objects":
+                    parser._expect("{")
+                    result[key] = parser.parse_dict_items("}", object_factory)
+                else:
+                    result[key] = parser.parse_value()
+                parser._expect(";")
+        if parser._next()[0] != "eof":
+            raise PBXParseError("文件末尾存在多余内容")
+        instrumentation.count("objects_parsed", len(result.get("objects", ())))
+        return result
+
+
+def parse_object_entries(text, pos=0, endpos=None):
+    """解析一段 `ID = { ... };` 序列（例如某个 section 的内容），返回 {ID: dict}"""
+    parser = _Parser(_tokens(text, pos, endpos))
+    entries = parser.parse_dict_items("eof")
+    instrumentation.count("objects_parsed", len(entries))
+    return entries
+
+
+def load_project(path=DEFAULT_PROJECT_PATH):
+    """读取并解析 project.pbxproj"""
+    with instrumentation.span("read", path):
+        with open(path, "rb") as f:
+            data = f.read()
+    instrumentation.count("bytes_read", len(data))
+    return parse_pbxproj(data.decode("utf-8"))
+
+
+def iter_objects(project, isa=None):
+    """遍历 objects，可按 isa 过滤，生成 (ID, dict)"""
+    for object_id, obj in project.get("objects", {}).items():
+        if isa is None or obj.get("isa") == isa:
+            yield object_id, obj
+
+
+def find_targets(project):
+    """返回 {target 名称: target ID}"""
+    return {obj.get("name"): object_id for object_id, obj in iter_objects(project, "PBXNativeTarget")}
+
+
+class LazyProject:
+    """按 section 惰性加载的只读 project.pbxproj"""
+
+    def __init__(self, path=DEFAULT_PROJECT_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法 mmap
+            self._file.close()
+            raise PBXParseError(f"项目文件为空: {path}")
+        instrumentation.count("bytes_mapped", len(self._map))
+        with instrumentation.span("index", "pbxproj sections"):
+            self._sections = self._index_sections()
+        self._parsed = {}
+
+    def _index_sections(self):
+        """一次扫描建立 {section 名称: (起始偏移, 结束偏移)}"""
+        sections = {}
+        begins = {}
+        for m in _SECTION_RE.finditer(self._map):
+            instrumentation.count("pbxproj.section_matches")
+            name = m.group(2).decode("ascii")
+            if m.group(1) == b"Begin":
+                begins[name] = m.end()
+            elif name in begins:
+                sections[name] = (begins.pop(name), m.start())
+        return sections
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def section_names(self):
+        return list(self._sections)
+
+    def section(self, name):
+        """返回某个 section 的 {ID: dict}；section 不存在时返回空 dict"""
+        if name not in self._parsed:
+            bounds = self._sections.get(name)
+            if bounds is None:
+                self._parsed[name] = {}
+            else:
+                with instrumentation.span("parse", f"{name} section"):
+                    text = self._map[bounds[0]:bounds[1]].decode("utf-8")
+                    instrumentation.count("bytes_read", bounds[1] - bounds[0])
+                    self._parsed[name] = parse_object_entries(text)
+        return self._parsed[name]
+
+    def root_object_id(self):
+        m = _ROOT_OBJECT_RE.search(self._map, max(0, len(self._map) - 4096))
+        return m.group(1).decode("ascii") if m else None
+
+
+# ---------------------------------------------------------------------------
+# 序列化
+# ---------------------------------------------------------------------------
+
+_UNQUOTED_RE = re.compile(r"^[A-Za-z0-9_$/:.]+$")
+_INLINE_ISAS = {"PBXBuildFile", "PBXFileReference"}
+_UNCOMMENTED_KEYS = {"remoteGlobalIDString", "TestTargetID"}
+_PHASE_NAMES = {
+    "PBXSourcesBuildPhase": "Sources",
+    "PBXResourcesBuildPhase": "Resources",
+    "PBXFrameworksBuildPhase": "Frameworks",
+    "PBXHeadersBuildPhase": "Headers",
+    "PBXCopyFilesBuildPhase": "CopyFiles",
+    "PBXShellScriptBuildPhase": "ShellScript",
+}
+
+
+def _quote(value):
+    if _UNQUOTED_RE.match(value) and "//" not in value:
+        return value
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"')
+               .replace("\n", "\\n").replace("\t", "\\t"))
+    return f'"{escaped}"'
+
+
+def object_comments(objects, project_name):
+    """计算每个对象 ID 在 Xcode 格式中附带的注释"""
+    comments = {}
+    owners = {}
+    exception_groups = {}        # exception set ID -> 所属的同步文件夹
+    for object_id, obj in objects.items():
+        isa = obj.get("isa")
+        for exception_id in obj.get("exceptions", ()):
+            exception_groups.setdefault(exception_id, obj)
+        if isa in _PHASE_NAMES:
+            comments[object_id] = obj.get("name", _PHASE_NAMES[isa])
+        elif isa == "PBXProject":
+            comments[object_id] = "Project object"
+            owners[obj.get("buildConfigurationList")] = f'PBXProject "{project_name}"'
+        elif isa in ("PBXNativeTarget", "PBXAggregateTarget", "PBXLegacyTarget"):
+            comments[object_id] = obj.get("name")
+            owners[obj.get("buildConfigurationList")] = f'{isa} "{obj.get("name")}"'
+        elif isa in ("PBXContainerItemProxy", "PBXTargetDependency"):
+            comments[object_id] = isa
+        elif "name" in obj or "path" in obj:
+            comments[object_id] = obj.get("name", obj.get("path"))
+
+    for object_id, obj in objects.items():
+        isa = obj.get("isa")
+        if isa == "XCConfigurationList" and object_id in owners:
+            comments[object_id] = f"Build configuration list for {owners[object_id]}"
+        elif isa == "PBXFileSystemSynchronizedBuildFileExceptionSet":
+            group = exception_groups.get(object_id, {})
+            target = objects.get(obj.get("target"), {})
+            comments[object_id] = (f'Exceptions for "{group.get("path")}" folder in '
+                                   f'"{target.get("name")}" target')
+        elif isa in _PHASE_NAMES:
+            for build_file_id in obj.get("files", ()):
+                build_file = objects.get(build_file_id, {})
+                ref = build_file.get("fileRef") or build_file.get("productRef")
+                name = comments.get(ref) or objects.get(ref, {}).get("productName")
+                if name:
+                    comments[build_file_id] = f"{name} in {comments[object_id]}"
+    return {k: v for k, v in comments.items() if v is not None}
+
+
+class _Writer:
+    def __init__(self, objects, comments):
+        self.objects = objects
+        self.comments = comments
+        self.out = []
+
+    def ref(self, value, key=None):
+        text = _quote(value)
+        if key not in _UNCOMMENTED_KEYS and value in self.comments:
+            text += f" /* {self.comments[value]} */"
+        return text
+
+    def value(self, value, indent, key=None, inline=False, comment_refs=True):
+        if isinstance(value, dict):
+            return self.dict(value, indent, inline, comment_refs)
+        if isinstance(value, (list, tuple)):
+            if inline:
+                return "(" + "".join(self.value(v, indent, key, True, comment_refs) + ", " for v in value) + ")"
+            pad = "\t" * (indent + 1)
+            items = "".join(f"{pad}{self.value(v, indent + 1, key, False, comment_refs)},\n" for v in value)
+            return "(\n" + items + "\t" * indent + ")"
+        return self.ref(value, key) if comment_refs else _quote(value)
+
+    def dict(self, value, indent, inline=False, comment_refs=True):
+        keys = sorted(value, key=lambda k: (k != "isa", k))
+        if inline:
+            body = "".join(f"{_quote(k)} = {self.value(value[k], indent, k, True, comment_refs)}; " for k in keys)
+            return "{" + body + "}"
+        pad = "\t" * (indent + 1)
+        # 嵌套字典（buildSettings、attributes 等）中的 ID 不带注释
+        items = "".join(f"{pad}{_quote(k)} = {self.value(value[k], indent + 1, k, False, False)};\n"
+                        if isinstance(value[k], dict) else
+                        f"{pad}{_quote(k)} = {self.value(value[k], indent + 1, k, False, comment_refs)};\n"
+                        for k in keys)
+        return "{\n" + items + "\t" * indent + "}"
+
+
+def dump_pbxproj(project, project_name=None):
+    """把 parse_pbxproj 格式的 dict 序列化为 Xcode 格式的文本"""
+    if project_name is None:
+        project_name = project_paths.project_name(DEFAULT_PROJECT_PATH)
+    with instrumentation.span("write", "serialize"):
+        objects = project.get("objects", {})
+        writer = _Writer(objects, object_comments(objects, project_name))
+
+        sections = {}
+        for object_id in sorted(objects):
+            sections.setdefault(objects[object_id].get("isa"), []).append(object_id)
+
+        lines = ["// !$*UTF8*$!", "{"]
+        for key in sorted(project):
+            if key != "objects":
+                lines.append(f"\t{_quote(key)} = {writer.value(project[key], 1, key)};")
+                continue
+            lines.append("\tobjects = {")
+            for isa in sorted(sections):
+                lines.append("")
+                lines.append(f"/* Begin {isa} section */")
+                inline = isa in _INLINE_ISAS
+                for object_id in sections[isa]:
+                    head = writer.ref(object_id)
+                    lines.append(f"\t\t{head} = {writer.dict(objects[object_id], 2, inline)};")
+                lines.append(f"/* End {isa} section */")
+            lines.append("\t};")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def save_project(project, path=DEFAULT_PROJECT_PATH):
+    """序列化并写回 project.pbxproj"""
+    data = dump_pbxproj(project, project_paths.project_name(path)).encode("utf-8")
+    with instrumentation.span("write", path):
+        with open(path, "wb") as f:
+            f.write(data)
+    instrumentation.count("bytes_written", len(data))
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+project.pbxproj 结构化 diff 与三方合并
+
+基于解析后的对象图按对象 ID 比较：children / files 等列表按元素合并，
+buildSettings 等字典按 key 合并，只有同一个值被双方改成不同结果时才算冲突。
+整体复杂度与对象数量成线性关系。
+
+  python3 pbxproj_merge.py diff OLD NEW
+  python3 pbxproj_merge.py merge BASE OURS THEIRS [-o OUTPUT]
+  python3 pbxproj_merge.py install        # 注册为 git merge driver
+
+作为 git merge driver 时（%O %A %B），合并结果写回 %A；
+存在冲突时冲突处保留我方的值，把冲突列表写入 %A.conflicts 并以非零状态退出，
+冲突解决后需要删除该文件。基线为空（add/add 冲突）时按空项目合并；
+任一方无法解析时不修改 %A，由 git 按普通冲突处理。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import pbxproj
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+
+# 这些字段保存的是其它对象的 ID，合并后需要检查引用是否存在
+REFERENCE_LIST_KEYS = {"children", "files", "buildPhases", "targets", "buildConfigurations", "dependencies"}
+REFERENCE_KEYS = {"fileRef", "buildConfigurationList", "productReference", "mainGroup", "target"}
+
+CONFLICTS_SUFFIX = ".conflicts"
+
+_MISSING = object()
+
+
+class Conflict:
+    """无法自动解决的冲突"""
+
+    def __init__(self, object_id, path, base, ours, theirs):
+        self.object_id = object_id
+        self.path = path
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+
+    def __str__(self):
+        def show(value):
+            return "<删除>" if value is _MISSING else repr(value)
+        where = ".".join(self.path) if self.path else "<对象>"
+        return (f"{self.object_id} {where}: 基线 {show(self.base)}, "
+                f"我方 {show(self.ours)}, 对方 {show(self.theirs)}")
+
+
+def diff_projects(old, new):
+    """比较两个项目，返回 (新增 ID 列表, 删除 ID 列表, {ID: [(路径, 旧值, 新值)]})"""
+    old_objects = old.get("objects", {})
+    new_objects = new.get("objects", {})
+    added = [oid for oid in new_objects if oid not in old_objects]
+    removed = [oid for oid in old_objects if oid not in new_objects]
+    changed = {}
+    for oid, new_obj in new_objects.items():
+        old_obj = old_objects.get(oid)
+        if old_obj is not None and old_obj != new_obj:
+            changes = []
+            _diff_values(old_obj, new_obj, (), changes)
+            changed[oid] = changes
+    return added, removed, changed
+
+
+def _diff_values(old, new, path, changes):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            a = old.get(key, _MISSING)
+            b = new.get(key, _MISSING)
+            if a != b:
+                _diff_values(a, b, path + (key,), changes)
+    else:
+        changes.append((path, old, new))
+
+
+def _merge_lists(base, ours, theirs):
+    """把列表当作有序集合合并：删除对方删掉的元素，插入对方新增的元素"""
+    base_set = set(base)
+    ours_set = set(ours)
+    theirs_set = set(theirs)
+    removed = base_set - theirs_set
+    result = [item for item in ours if item not in removed]
+    present = set(result)
+    # 把对方新增的元素插到它在对方列表中前一个元素之后
+    positions = {item: i for i, item in enumerate(result)}
+    inserts = {}
+    previous = None
+    for item in theirs:
+        if item not in base_set and item not in ours_set and item not in present:
+            inserts.setdefault(previous, []).append(item)
+            present.add(item)
+        elif item in positions:
+            previous = item
+    if not inserts:
+        return result
+    merged = list(inserts.get(None, ()))
+    for item in result:
+        merged.append(item)
+        merged.extend(inserts.get(item, ()))
+    return merged
+
+
+def _merge_values(base, ours, theirs, object_id, path, conflicts):
+    if ours == theirs:
+        return ours
+    if base == ours:
+        return theirs
+    if base == theirs:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        result = {}
+        for key in list(ours) + [k for k in theirs if k not in ours]:
+            value = _merge_values(base.get(key, _MISSING), ours.get(key, _MISSING),
+                                  theirs.get(key, _MISSING), object_id, path + (key,), conflicts)
+            if value is not _MISSING:
+                result[key] = value
+        return result
+    if isinstance(ours, list) and isinstance(theirs, list):
+        return _merge_lists(base if isinstance(base, list) else [], ours, theirs)
+    conflicts.append(Conflict(object_id, path, base, ours, theirs))
+    return ours
+
+
+def merge_projects(base, ours, theirs):
+    """三方合并，返回 (合并后的项目, 冲突列表)"""
+    conflicts = []
+    result = _merge_values({k: v for k, v in base.items() if k != "objects"},
+                           {k: v for k, v in ours.items() if k != "objects"},
+                           {k: v for k, v in theirs.items() if k != "objects"},
+                           "<project>", (), conflicts)
+    if result is _MISSING:
+        result = {}
+
+    base_objects = base.get("objects", {})
+    our_objects = ours.get("objects", {})
+    their_objects = theirs.get("objects", {})
+    merged = {}
+    for oid in list(our_objects) + [k for k in their_objects if k not in our_objects]:
+        value = _merge_values(base_objects.get(oid, _MISSING), our_objects.get(oid, _MISSING),
+                              their_objects.get(oid, _MISSING), oid, (), conflicts)
+        if value is not _MISSING:
+            merged[oid] = value
+    result["objects"] = merged
+
+    conflicts.extend(_dangling_references(merged))
+    return result, conflicts
+
+
+def _dangling_references(objects):
+    """查找引用了不存在对象的字段（例如一方删除文件、另一方新增了它的 build file）"""
+    conflicts = []
+    for oid, obj in objects.items():
+        for key, value in obj.items():
+            if key in REFERENCE_LIST_KEYS and isinstance(value, list):
+                missing = [v for v in value if v not in objects]
+            elif key in REFERENCE_KEYS and isinstance(value, str):
+                missing = [value] if value not in objects else []
+            else:
+                continue
+            for ref in missing:
+                conflicts.append(Conflict(oid, (key,), _MISSING, ref, _MISSING))
+    return conflicts
+
+
+def _membership(items):
+    """用于 in 判断的集合；元素不可哈希（列表中的 dict）时退回列表本身"""
+    try:
+        return set(items)
+    except TypeError:
+        return items
+
+
+def print_diff(old, new):
+    added, removed, changed = diff_projects(old, new)
+    new_objects = new.get("objects", {})
+    old_objects = old.get("objects", {})
+    comments = pbxproj.object_comments(new_objects, "")
+    old_comments = pbxproj.object_comments(old_objects, "")
+
+    for oid in added:
+        print(f"+ {oid} {new_objects[oid].get('isa')} {comments.get(oid, '')}")
+    for oid in removed:
+        print(f"- {oid} {old_objects[oid].get('isa')} {old_comments.get(oid, '')}")
+    for oid, changes in changed.items():
+        print(f"~ {oid} {new_objects[oid].get('isa')} {comments.get(oid, '')}")
+        for path, a, b in changes:
+            where = ".".join(path)
+            if isinstance(a, list) and isinstance(b, list):
+                a_items = _membership(a)
+                b_items = _membership(b)
+                for item in b:
+                    if item not in a_items:
+                        print(f"    {where} + {item} {comments.get(item, '')}")
+                for item in a:
+                    if item not in b_items:
+                        print(f"    {where} - {item} {old_comments.get(item, '')}")
+                continue
+            a = "<无>" if a is _MISSING else a
+            b = "<无>" if b is _MISSING else b
+            print(f"    {where}: {a!r} -> {b!r}")
+    return bool(added or removed or changed)
+
+
+def install_driver():
+    """在当前仓库注册 merge driver 并写入 .gitattributes"""
+    script = os.path.relpath(os.path.abspath(__file__), PROJECT_ROOT)
+    subprocess.run(["git", "config", "merge.pbxproj.name", "project.pbxproj structural merge"], check=True)
+    subprocess.run(["git", "config", "merge.pbxproj.driver", f"python3 {script} merge %O %A %B -o %A"], check=True)
+
+    attributes_path = os.path.join(PROJECT_ROOT, ".gitattributes")
+    line = "*.pbxproj merge=pbxproj"
+    existing = ""
+    if os.path.exists(attributes_path):
+        with open(attributes_path, "r") as f:
+            existing = f.read()
+    if line not in existing.splitlines():
+        with open(attributes_path, "a") as f:
+            if existing and not existing.endswith("\n"):
+                f.write("\n")
+            f.write(line + "\n")
+    print("✅ 已注册 project.pbxproj merge driver")
+
+
+def load_side(path, allow_empty=False):
+    """读取合并的一方；allow_empty 时空文件视为空项目"""
+    if allow_empty and os.path.getsize(path) == 0:
+        return {}
+    return pbxproj.load_project(path)
+
+
+def write_conflicts(path, conflicts):
+    """把冲突列表写入 path；没有冲突时删除上一次留下的文件"""
+    if not conflicts:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# {len(conflicts)} 处 project.pbxproj 合并冲突，项目文件中保留了我方的值。\n")
+        f.write("# 逐条确认并修改项目文件后删除本文件。\n")
+        for conflict in conflicts:
+            f.write(f"{conflict}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="project.pbxproj 结构化 diff / 三方合并")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    diff = sub.add_parser("diff", help="显示两个项目文件的结构化差异")
+    diff.add_argument("old")
+    diff.add_argument("new")
+
+    merge = sub.add_parser("merge", help="三方合并")
+    merge.add_argument("base")
+    merge.add_argument("ours")
+    merge.add_argument("theirs")
+    merge.add_argument("-o", "--output", help="输出路径（默认输出到标准输出）")
+
+    sub.add_parser("install", help="注册为 git merge driver")
+    args = parser.parse_args(argv)
+
+    if args.command == "install":
+        install_driver()
+        return 0
+
+    if args.command == "diff":
+        changed = print_diff(pbxproj.load_project(args.old), pbxproj.load_project(args.new))
+        return 1 if changed else 0
+
+    sides = []
+    for label, path in (("基线", args.base), ("我方", args.ours), ("对方", args.theirs)):
+        try:
+            sides.append(load_side(path, allow_empty=path is args.base))
+        except (OSError, UnicodeDecodeError, pbxproj.PBXParseError) as e:
+            print(f"❌ 无法解析{label}的项目文件 {path}: {e}", file=sys.stderr)
+            print("   未修改任何文件，请手动合并", file=sys.stderr)
+            return 2
+    result, conflicts = merge_projects(*sides)
+    text = pbxproj.dump_pbxproj(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        write_conflicts(args.output + CONFLICTS_SUFFIX, conflicts)
+    else:
+        sys.stdout.write(text)
+
+    if conflicts:
+        print(f"❌ {len(conflicts)} 处冲突（已保留我方的值）:", file=sys.stderr)
+        for conflict in conflicts:
+            print(f"  {conflict}", file=sys.stderr)
+        if args.output:
+            print(f"   冲突列表已写入 {args.output}{CONFLICTS_SUFFIX}，解决后删除该文件", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
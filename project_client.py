@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+项目常驻进程的客户端
+
+只读工具通过这里读取 project.pbxproj 和 plist：常驻进程（project_daemon.py）
+在运行时经 Unix socket 直接取它内存中的解析结果，省去每次冷启动的解析；
+进程未运行、连接超时或查询失败时在本地解析，结果与常驻进程一致。
+
+  graph = project_client.load_graph(project_path)
+  configurations = project_client.read_section("XCBuildConfiguration", project_path)
+  info = project_client.read_plist(path)
+"""
+
+import json
+import os
+
+import project_paths
+
+SOCKET_NAME = ".project_daemon.sock"
+QUERY_TIMEOUT = 5.0
+
+
+def default_socket_path(root=None):
+    return os.path.join(root or project_paths.find_project_root(), SOCKET_NAME)
+
+
+def query(command, *args, socket_path=None, timeout=QUERY_TIMEOUT):
+    """向常驻进程发送查询，返回结果
+
+    进程未运行时抛出 ConnectionError，超时抛出 TimeoutError，
+    常驻进程执行命令出错时抛出 RuntimeError。
+    """
+    import socket
+
+    socket_path = socket_path or default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"常驻进程未运行: {socket_path}") from e
+        request = {"cmd": command, "args": list(args)}
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError(f"常驻进程关闭了连接: {socket_path}")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def _daemon_relpath(path, root):
+    """path 在 root 中的相对路径；不在 root 中或常驻进程未运行时返回 None"""
+    relpath = os.path.relpath(os.path.abspath(path), root)
+    if relpath.startswith(os.pardir):
+        return None
+    if not os.path.exists(os.path.join(root, SOCKET_NAME)):
+        return None
+    return relpath
+
+
+def _try_query(root, command, *args):
+    """返回 (是否成功, 结果)；任何连接或查询错误都视为常驻进程不可用"""
+    try:
+        return True, query(command, *args, socket_path=os.path.join(root, SOCKET_NAME))
+    except (OSError, RuntimeError, ValueError):
+        return False, None
+
+
+def decode_plist(value):
+    """还原常驻进程对 <data> / <date> 的编码（见 project_daemon._encode_plist）"""
+    if isinstance(value, dict):
+        if len(value) == 1 and "$data" in value:
+            import base64
+
+            return base64.b64decode(value["$data"])
+        if len(value) == 1 and "$date" in value:
+            from datetime import datetime
+
+            return datetime.fromisoformat(value["$date"])
+        return {key: decode_plist(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_plist(item) for item in value]
+    return value
+
+
+def read_plist(path, root=None):
+    """读取 plist / entitlements"""
+    root = root or project_paths.find_project_root()
+    relpath = _daemon_relpath(path, root)
+    if relpath is not None:
+        ok, result = _try_query(root, "plist", relpath)
+        if ok:
+            return decode_plist(result)
+
+    import plistlib
+
+    with open(path, "rb") as f:
+        return plistlib.load(f)
+
+
+def _is_daemon_project(project_path, root):
+    relpath = _daemon_relpath(project_path, root)
+    return relpath is not None and os.path.join(root, relpath) == project_paths.project_file(root)
+
+
+def read_section(isa, project_path=None, root=None):
+    """返回项目文件中某种 isa 的 {ID: dict}（与 pbxproj.LazyProject.section 相同）"""
+    root = root or project_paths.find_project_root()
+    project_path = project_path or project_paths.project_file(root)
+    if _is_daemon_project(project_path, root):
+        ok, result = _try_query(root, "objects", isa)
+        if ok:
+            return result
+
+    import pbxproj
+
+    with pbxproj.LazyProject(project_path) as project:
+        return project.section(isa)
+
+
+def load_graph(project_path=None, root=None):
+    """返回 project.pbxproj 的 pbx_objects.ObjectGraph"""
+    import pbx_objects
+
+    root = root or project_paths.find_project_root()
+    project_path = project_path or project_paths.project_file(root)
+    if _is_daemon_project(project_path, root):
+        ok, result = _try_query(root, "graph")
+        if ok:
+            return pbx_objects.graph_from_dict(result)
+    return pbx_objects.load_graph(project_path)
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+项目常驻进程
+
+常驻内存保存解析后的 project.pbxproj（紧凑对象图）、按需加载的 plist 以及文件树快照，
+监听文件变化（Linux 上使用 inotify，其它平台退化为 mtime 轮询），
+只重新解析发生变化的文件，并通过本地 Unix socket 响应查询请求。
+只读工具经 project_client.py 查询，常驻进程未运行时在本地解析。
+
+  python3 project_daemon.py start            # 前台启动
+  python3 project_daemon.py query targets    # 查询
+  python3 project_daemon.py stop
+"""
+
+import argparse
+import base64
+import ctypes
+import ctypes.util
+import json
+import os
+import plistlib
+import selectors
+import socket
+import struct
+import sys
+import time
+from datetime import datetime
+
+import pbx_objects
+import pbxproj
+import project_paths
+from project_client import SOCKET_NAME, default_socket_path, query
+
+PROJECT_ROOT = project_paths.find_project_root()
+PROJECT_FILE = os.path.relpath(project_paths.project_file(PROJECT_ROOT), PROJECT_ROOT)
+
+PLIST_SUFFIXES = (".plist", ".entitlements")
+POLL_INTERVAL = 1.0
+# 单个客户端请求的最长处理时间和请求大小，避免一个不发送换行的连接阻塞常驻进程
+CLIENT_TIMEOUT = 2.0
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def scan_tree(root):
+    """生成文件树快照 {相对路径: (mtime_ns, size)}"""
+    snapshot = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in project_paths.SKIP_DIRS]
+        for name in filenames:
+            if name == SOCKET_NAME:
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[os.path.relpath(path, root)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class ProjectState:
+    """常驻内存的项目状态"""
+
+    def __init__(self, root=PROJECT_ROOT):
+        self.root = root
+        self.graph = None
+        self.plists = {}
+        self.snapshot = scan_tree(root)
+        self.reparse_count = 0
+        self._reload_project()
+
+    def _reload_project(self):
+        self.graph = pbx_objects.load_graph(os.path.join(self.root, PROJECT_FILE))
+        self.reparse_count += 1
+
+    def rescan(self):
+        """事件丢失（inotify 队列溢出）后重新扫描整个文件树"""
+        self.snapshot = scan_tree(self.root)
+        self.plists.clear()
+        self._try_reload_project()
+
+    def _try_reload_project(self):
+        try:
+            self._reload_project()
+        except (OSError, pbxproj.PBXParseError) as e:
+            # 编辑过程中可能读到半写入的文件，保留上一次的解析结果
+            print(f"⚠️  重新解析项目文件失败: {e}", file=sys.stderr)
+
+    def _forget(self, relpath):
+        """删除或移走的路径：如果是目录，其下的文件也一并从快照中移除"""
+        self.snapshot.pop(relpath, None)
+        self.plists.pop(relpath, None)
+        prefix = relpath + os.sep
+        for stale in [p for p in self.snapshot if p.startswith(prefix)]:
+            del self.snapshot[stale]
+            self.plists.pop(stale, None)
+
+    def refresh(self, relpath):
+        """查询前确认文件与快照一致，弥补轮询间隔或尚未处理的事件"""
+        try:
+            st = os.stat(os.path.join(self.root, relpath))
+            current = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            current = None
+        if self.snapshot.get(relpath) != current:
+            self.apply_changes([relpath])
+
+    def apply_changes(self, relpaths):
+        """根据变化的文件增量更新状态；relpaths 为 None 时全量重新扫描"""
+        if relpaths is None:
+            self.rescan()
+            return
+        for relpath in relpaths:
+            path = os.path.join(self.root, relpath)
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if st is None:
+                self._forget(relpath)
+                continue
+            if os.path.isdir(path):
+                # 新建或移入的目录：把其中的文件并入快照
+                for sub, info in scan_tree(path).items():
+                    self.snapshot[os.path.join(relpath, sub)] = info
+                continue
+            else:
+                self.snapshot[relpath] = (st.st_mtime_ns, st.st_size)
+
+            if relpath == PROJECT_FILE:
+                self._try_reload_project()
+            elif relpath.endswith(PLIST_SUFFIXES):
+                self.plists.pop(relpath, None)
+
+    def get_plist(self, relpath):
+        relpath = os.path.normpath(relpath)
+        if os.path.isabs(relpath) or relpath.startswith(os.pardir):
+            raise ValueError(f"路径不在项目目录中: {relpath}")
+        self.refresh(relpath)
+        if relpath not in self.plists:
+            with open(os.path.join(self.root, relpath), "rb") as f:
+                self.plists[relpath] = _encode_plist(plistlib.load(f))
+        return self.plists[relpath]
+
+    def handle(self, command, args):
+        """执行一条查询命令，返回可 JSON 序列化的结果"""
+        if command == "ping":
+            return "pong"
+        if command in ("targets", "object", "objects", "graph"):
+            self.refresh(PROJECT_FILE)
+        graph = self.graph
+        if command == "stats":
+            return {
+                "objects": len(graph),
+                "files": len(self.snapshot),
+                "cached_plists": len(self.plists),
+                "reparse_count": self.reparse_count,
+            }
+        if command == "targets":
+            return {target.name: target.id for target in graph.targets()}
+        if command == "object":
+            obj = graph.get(args[0])
+            return obj.to_dict() if obj is not None else None
+        if command == "objects":
+            objects = graph.by_isa(args[0]) if args else graph.objects.values()
+            return {obj.id: obj.to_dict() for obj in objects}
+        if command == "graph":
+            return graph.to_dict()
+        if command == "plist":
+            return self.get_plist(args[0])
+        if command == "files":
+            prefix = args[0] if args else ""
+            return sorted(p for p in self.snapshot if p.startswith(prefix))
+        raise ValueError(f"未知命令: {command}")
+
+
+def _encode_plist(value):
+    """把 plist 中 JSON 无法表示的 <data> / <date> 转换为 {"$data": base64} / {"$date": ISO 8601}，
+    由 project_client.decode_plist 还原"""
+    if isinstance(value, dict):
+        return {key: _encode_plist(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode_plist(item) for item in value]
+    if isinstance(value, bytes):
+        return {"$data": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+class PollingWatcher:
+    """通过比较 mtime/size 快照检测变化"""
+
+    def __init__(self, root):
+        self.root = root
+        self._snapshot = scan_tree(root)
+
+    def fileno(self):
+        return None
+
+    def read_changes(self):
+        current = scan_tree(self.root)
+        changed = [p for p, info in current.items() if self._snapshot.get(p) != info]
+        changed.extend(p for p in self._snapshot if p not in current)
+        self._snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """基于 Linux inotify 的递归目录监听"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.root = root
+        self._dirs = {}
+        self._add_tree(root)
+
+    def _add_tree(self, path):
+        """监听 path 及其下所有子目录（已监听的目录 inotify 返回原来的 wd，只更新路径）"""
+        for dirpath, dirnames, _ in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d not in project_paths.SKIP_DIRS]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = os.path.relpath(dirpath, self.root)
+
+    def _remove_tree(self, relpath):
+        """移走的目录：inotify 的 watch 跟随 inode，不再按旧路径报告事件"""
+        prefix = relpath + os.sep
+        for wd, directory in list(self._dirs.items()):
+            if directory == relpath or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+
+    def fileno(self):
+        return self._fd
+
+    def read_changes(self):
+        """返回变化的相对路径列表；事件队列溢出时返回 None，需要全量重新扫描"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        overflow = False
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + length].rstrip(b"\0")
+            offset += header_size + length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & self.IN_IGNORED:
+                # 目录被删除后内核自动移除了 watch
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            name = os.fsdecode(name)
+            if name in project_paths.SKIP_DIRS or name == SOCKET_NAME:
+                continue
+            relpath = os.path.normpath(os.path.join(directory, name))
+            if mask & self.IN_ISDIR:
+                if mask & self.IN_MOVED_FROM:
+                    self._remove_tree(relpath)
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(os.path.join(self.root, relpath))
+            changed.append(relpath)
+        if overflow:
+            # 丢失的事件无法还原，重新建立全部 watch
+            self._add_tree(self.root)
+            return None
+        # 同一批事件中重复的路径只处理一次
+        return list(dict.fromkeys(changed))
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(root):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def serve(root=PROJECT_ROOT, socket_path=None):
+    """启动常驻进程，直到收到 shutdown 命令"""
+    socket_path = socket_path or default_socket_path(root)
+    state = ProjectState(root)
+    watcher = make_watcher(root)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    server.setblocking(False)
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, "client")
+    if watcher.fileno() is not None:
+        selector.register(watcher.fileno(), selectors.EVENT_READ, "watch")
+    timeout = None if watcher.fileno() is not None else POLL_INTERVAL
+
+    print(f"🚀 项目常驻进程已启动 ({type(watcher).__name__}): {socket_path}")
+    running = True
+    last_poll = time.monotonic()
+    try:
+        while running:
+            events = selector.select(timeout)
+            if timeout is not None and time.monotonic() - last_poll >= timeout:
+                state.apply_changes(watcher.read_changes())
+                last_poll = time.monotonic()
+            # 先处理文件变化，再响应同一批到达的查询
+            for key, _ in sorted(events, key=lambda event: event[0].data != "watch"):
+                if key.data == "watch":
+                    state.apply_changes(watcher.read_changes())
+                elif running:
+                    try:
+                        conn, _ = server.accept()
+                    except BlockingIOError:
+                        continue
+                    with conn:
+                        running = _handle_client(conn, state)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        selector.close()
+        watcher.close()
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def _read_request(conn, timeout=CLIENT_TIMEOUT):
+    """读取一行请求；超时、超长或连接提前关闭时抛出 OSError"""
+    deadline = time.monotonic() + timeout
+    data = b""
+    while b"\n" not in data:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("读取请求超时")
+        if len(data) > MAX_REQUEST_BYTES:
+            raise OSError("请求过长")
+        conn.settimeout(remaining)
+        chunk = conn.recv(4096)
+        if not chunk:
+            raise ConnectionError("客户端关闭了连接")
+        data += chunk
+    return data.split(b"\n", 1)[0]
+
+
+def _handle_client(conn, state):
+    """处理一个请求（一行 JSON），返回是否继续运行"""
+    try:
+        line = _read_request(conn)
+    except OSError as e:
+        print(f"⚠️  忽略客户端请求: {e}", file=sys.stderr)
+        return True
+    try:
+        request = json.loads(line)
+        command = request.get("cmd")
+        if command == "shutdown":
+            response = {"ok": True, "result": "bye"}
+        else:
+            response = {"ok": True, "result": state.handle(command, request.get("args", []))}
+        # 序列化也在保护范围内：任何一个请求出错都只影响它自己的响应
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    except Exception as e:
+        command = None
+        data = json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"}, ensure_ascii=False).encode("utf-8")
+    try:
+        conn.settimeout(CLIENT_TIMEOUT)
+        conn.sendall(data + b"\n")
+    except OSError as e:
+        print(f"⚠️  发送响应失败: {e}", file=sys.stderr)
+    return command != "shutdown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="项目常驻进程")
+    parser.add_argument("--socket", help="Unix socket 路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("start", help="在前台启动常驻进程")
+    sub.add_parser("stop", help="停止常驻进程")
+    q = sub.add_parser("query", help="发送查询命令")
+    q.add_argument("cmd", help="ping / stats / targets / object / objects / graph / plist / files")
+    q.add_argument("args", nargs="*")
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        serve(PROJECT_ROOT, args.socket)
+        return 0
+    args.socket = args.socket or default_socket_path(PROJECT_ROOT)
+    try:
+        if args.command == "stop":
+            query("shutdown", socket_path=args.socket)
+            print("✅ 常驻进程已停止")
+        else:
+            start = time.perf_counter()
+            result = query(args.cmd, *args.args, socket_path=args.socket)
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            print(f"⏱  {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+项目根目录定位
+
+按以下顺序查找包含 Weather.xcodeproj 的目录：
+  1. 环境变量 WEATHER_PROJECT_ROOT
+  2. 从当前工作目录向上逐级查找
+  3. 脚本所在目录
+"""
+
+import os
+
+PROJECT_BUNDLE = "Weather.xcodeproj"
+ROOT_ENV = "WEATHER_PROJECT_ROOT"
+
+# 遍历源文件和监听文件变化时跳过的目录
+SKIP_DIRS = {
+    ".git", ".swiftpm", "build", "DerivedData", "docs", "node_modules", "Pods", "profile", "vercel-proxy",
+    "xcuserdata", "__pycache__",
+}
+
+
+def _is_root(path):
+    return os.path.isdir(os.path.join(path, PROJECT_BUNDLE))
+
+
+def find_project_root(start=None):
+    """返回项目根目录的绝对路径"""
+    env_root = os.environ.get(ROOT_ENV)
+    if env_root:
+        return os.path.abspath(env_root)
+
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        if _is_root(path):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def project_file(root=None):
+    """返回 project.pbxproj 的路径"""
+    return os.path.join(root or find_project_root(), PROJECT_BUNDLE, "project.pbxproj")
+
+
+def project_name(path):
+    """由 project.pbxproj 的路径得到项目名称，例如 .../Weather.xcodeproj/project.pbxproj -> Weather"""
+    return os.path.basename(os.path.dirname(path)).rsplit(".", 1)[0]
+
+
+def is_strings_table(path):
+    """*.lproj 目录中的 .strings 字符串表"""
+    return path.endswith(".strings") and os.path.basename(os.path.dirname(path)).endswith(".lproj")
+
+
+def iter_files(root, suffixes):
+    """按目录顺序返回 root 下以 suffixes 结尾的文件路径，跳过 SKIP_DIRS 和 .xcodeproj"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.endswith(".xcodeproj"))
+        for name in sorted(filenames):
+            if name.endswith(suffixes):
+                yield os.path.join(dirpath, name)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Target 成员关系检查
+
+通过对象图把磁盘上的源文件和资源映射到各个 target：
+  - Sources / Resources build phase 中的 PBXBuildFile -> fileRef
+    （PBXVariantGroup 展开为各 locale 的文件）
+  - target 的 fileSystemSynchronizedGroups 文件夹中的全部文件，
+    扣除该 target 的 membershipExceptions
+
+报告：
+  不属于任何 target    项目文件夹中存在、但没有被任何 target 编译或打包
+  磁盘上不存在         被项目引用、但磁盘上找不到
+  重复                 在同一个 target 中出现多次（会被编译或复制两次）
+  缺少共享成员         EXPECTED_MEMBERSHIP 中要求同时属于多个 target 的文件
+
+所有查找都基于 dict / set 索引，复杂度与文件数和 build file 数成线性关系。
+
+  python3 target_membership.py [--project PATH] [-v]
+"""
+
+import argparse
+import os
+import sys
+
+import instrumentation
+import pbx_objects
+import project_client
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+
+SOURCE_EXTENSIONS = {".swift", ".m", ".mm", ".c", ".cc", ".cpp", ".metal", ".intentdefinition"}
+RESOURCE_EXTENSIONS = {
+    ".strings", ".stringsdict", ".xcstrings", ".json", ".png", ".jpg", ".jpeg", ".pdf", ".gif",
+    ".storyboard", ".xib", ".ttf", ".otf", ".mp3", ".wav", ".caf", ".mov", ".mp4", ".html",
+}
+# 作为一个整体加入 target 的目录
+BUNDLE_EXTENSIONS = {".xcassets": "resources", ".xcdatamodeld": "sources", ".bundle": "resources",
+                     ".scnassets": "resources"}
+# 不参与检查的文件（SwiftPM 清单等）
+IGNORED_NAMES = {"Package.swift"}
+
+# 需要同时编译进多个 target 的共享文件（相对于项目根目录）
+EXPECTED_MEMBERSHIP = {
+    os.path.join("Weather", "Services", "WidgetDataManager.swift"): ("WeathersPro", "WeatherWidgetExtension"),
+}
+
+_PHASE_KINDS = {"PBXSourcesBuildPhase": "sources", "PBXResourcesBuildPhase": "resources"}
+
+
+def file_kind(path):
+    """返回 'sources'、'resources' 或 None（不会被加入 target 的文件）"""
+    name = os.path.basename(path)
+    if name in IGNORED_NAMES:
+        return None
+    ext = os.path.splitext(name)[1]
+    if ext in BUNDLE_EXTENSIONS:
+        return BUNDLE_EXTENSIONS[ext]
+    if ext in SOURCE_EXTENSIONS:
+        return "sources"
+    if ext in RESOURCE_EXTENSIONS:
+        return "resources"
+    return None
+
+
+def walk_units(directory):
+    """返回目录下可以加入 target 的文件 [(路径, 类型)]，.xcassets 等目录作为一个整体"""
+    units = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        keep = []
+        for name in sorted(dirnames):
+            if name in project_paths.SKIP_DIRS or name.startswith("."):
+                continue
+            ext = os.path.splitext(name)[1]
+            if ext in BUNDLE_EXTENSIONS:
+                units.append((os.path.join(dirpath, name), BUNDLE_EXTENSIONS[ext]))
+            elif not name.endswith(".xcodeproj"):
+                keep.append(name)
+        dirnames[:] = keep
+        for name in sorted(filenames):
+            kind = file_kind(name)
+            if kind is not None:
+                units.append((os.path.join(dirpath, name), kind))
+    instrumentation.count("membership.disk_units", len(units))
+    return units
+
+
+class MembershipReport:
+    def __init__(self):
+        self.members = {}            # target 名称 -> {路径: [来源, ...]}
+        self.unassigned = []         # 不属于任何 target 的磁盘文件
+        self.missing = []            # (路径, 引用者)
+        self.duplicates = []         # (target, 路径, [来源])
+        self.expected = []           # (路径, [缺少的 target])
+
+    def has_errors(self):
+        return bool(self.missing or self.duplicates or self.expected)
+
+
+class MembershipAnalyzer:
+    """根据对象图计算每个 target 包含的文件"""
+
+    def __init__(self, graph, source_root=PROJECT_ROOT):
+        self.graph = graph
+        self.source_root = source_root
+        self._paths = {}            # full_path 的缓存
+        self._walks = {}            # 目录 -> walk_units 结果
+
+    def path_of(self, object_id):
+        return self.graph.full_path(object_id, self.source_root, self._paths)
+
+    def _units(self, directory):
+        if directory not in self._walks:
+            self._walks[directory] = walk_units(directory) if os.path.isdir(directory) else []
+        return self._walks[directory]
+
+    def _file_paths(self, ref_id):
+        """fileRef 对应的磁盘路径；PBXVariantGroup 展开为各 locale 的文件
+
+        XCVersionGroup（.xcdatamodeld）与 walk_units 一致，作为一个整体按自身路径解析。
+        """
+        obj = self.graph.get(ref_id)
+        if isinstance(obj, pbx_objects.PBXVariantGroup):
+            return [p for p in (self.path_of(child) for child in obj.children or ()) if p]
+        path = self.path_of(ref_id)
+        return [path] if path else []
+
+    def _phase_members(self, target, members):
+        for phase_id in target.buildPhases or ():
+            phase = self.graph.get(phase_id)
+            kind = _PHASE_KINDS.get(phase.isa) if phase is not None else None
+            if kind is None:
+                continue
+            for build_file_id in phase.files or ():
+                instrumentation.count("membership.build_files")
+                build_file = self.graph.get(build_file_id)
+                ref_id = build_file.fileRef if build_file is not None else None
+                if ref_id is None:
+                    continue
+                for path in self._file_paths(ref_id):
+                    members.setdefault(path, []).append(f"{kind} phase")
+
+    def _exceptions(self, group, target):
+        """该 target 在同步文件夹中排除的相对路径"""
+        excluded = set()
+        for exception_id in group.exceptions or ():
+            exception = self.graph.get(exception_id)
+            if exception is not None and exception.target == target.id:
+                excluded.update(exception.membershipExceptions or ())
+        return excluded
+
+    def _synchronized_members(self, target, members):
+        for group_id in target.fileSystemSynchronizedGroups or ():
+            group = self.graph.get(group_id)
+            directory = self.path_of(group_id)
+            if group is None or directory is None:
+                continue
+            excluded = self._exceptions(group, target)
+            for path, kind in self._units(directory):
+                relpath = os.path.relpath(path, directory)
+                if excluded and _is_excluded(relpath, excluded):
+                    continue
+                members.setdefault(path, []).append(f"{group.path} 文件夹")
+
+    def analyze(self):
+        report = MembershipReport()
+        assigned = set()
+        with instrumentation.span("index", "target membership"):
+            for target in self.graph.targets():
+                members = {}
+                self._phase_members(target, members)
+                self._synchronized_members(target, members)
+                report.members[target.name] = members
+                assigned.update(members)
+                for path, origins in members.items():
+                    if len(origins) > 1:
+                        report.duplicates.append((target.name, path, origins))
+
+        with instrumentation.span("validate", "target membership"):
+            for path, _ in self._scan_roots_units():
+                if path not in assigned:
+                    report.unassigned.append(path)
+
+            # 被 build phase 或项目引用、但不存在的文件；遍历时见过的文件不再 stat
+            on_disk = {path for units in self._walks.values() for path, _ in units}
+            referenced = {}
+            for name, members in report.members.items():
+                for path in members:
+                    referenced.setdefault(path, name)
+            for obj in self.graph.by_isa("PBXFileReference"):
+                path = self.path_of(obj.id)
+                if path is not None:
+                    referenced.setdefault(path, "项目文件引用")
+            for obj in self.graph.by_isa("PBXFileSystemSynchronizedRootGroup"):
+                path = self.path_of(obj.id)
+                if path is not None:
+                    referenced.setdefault(path, "同步文件夹")
+            report.missing = sorted((path, owner) for path, owner in referenced.items()
+                                    if path not in on_disk and not os.path.exists(path))
+
+            for relpath, targets in EXPECTED_MEMBERSHIP.items():
+                path = os.path.join(self.source_root, relpath)
+                if not os.path.exists(path):
+                    continue
+                absent = [t for t in targets if t in report.members and path not in report.members[t]]
+                if absent:
+                    report.expected.append((path, absent))
+        return report
+
+    def _scan_roots_units(self):
+        """主 group 下各文件夹中的全部文件（项目根目录下的脚本不在检查范围内）"""
+        project = self.graph.project()
+        main_group = self.graph.get(project.mainGroup) if project is not None else None
+        seen = set()
+        for child_id in (main_group.children or ()) if main_group is not None else ():
+            child = self.graph.get(child_id)
+            if (not isinstance(child, (pbx_objects.PBXGroup, pbx_objects.PBXFileSystemSynchronizedRootGroup))
+                    or isinstance(child, pbx_objects.XCVersionGroup)):
+                continue
+            directory = self.path_of(child_id)
+            if directory is None or directory in seen or os.path.normpath(directory) == os.path.normpath(self.source_root):
+                continue
+            seen.add(directory)
+            yield from self._units(directory)
+
+
+def _is_excluded(relpath, excluded):
+    """relpath 本身或它所在的任意一级文件夹在 excluded 中"""
+    while relpath:
+        if relpath in excluded:
+            return True
+        relpath = os.path.dirname(relpath)
+    return False
+
+
+def print_report(report, source_root=PROJECT_ROOT, verbose=False):
+    def rel(path):
+        return os.path.relpath(path, source_root)
+
+    for name, members in report.members.items():
+        sources = sum(1 for p in members if file_kind(p) == "sources")
+        print(f"  📦 {name}: {sources} 个源文件, {len(members) - sources} 个资源")
+        if verbose:
+            for path in sorted(members):
+                print(f"      {rel(path)}  ({', '.join(members[path])})")
+
+    for path in report.unassigned:
+        print(f"  ⚠️  不属于任何 target: {rel(path)}")
+    for path, owner in report.missing:
+        print(f"  ❌ 磁盘上不存在: {rel(path)} (引用者: {owner})")
+    for target, path, origins in report.duplicates:
+        print(f"  ❌ {target} 中重复包含 {rel(path)}: {', '.join(origins)}")
+    for path, targets in report.expected:
+        print(f"  ❌ {rel(path)} 需要加入: {', '.join(targets)}")
+    if not (report.unassigned or report.has_errors()):
+        print("  ✅ 所有文件都属于 target，且没有缺失或重复")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查源文件和资源的 target 成员关系")
+    parser.add_argument("--project", default=project_paths.project_file(PROJECT_ROOT))
+    parser.add_argument("-v", "--verbose", action="store_true", help="列出每个 target 包含的文件")
+    args = parser.parse_args(argv)
+
+    source_root = os.path.dirname(os.path.dirname(os.path.abspath(args.project)))
+    print("🔍 检查 target 成员关系...")
+    analyzer = MembershipAnalyzer(project_client.load_graph(args.project, source_root), source_root)
+    report = analyzer.analyze()
+    print_report(report, source_root, args.verbose)
+    return 1 if report.has_errors() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
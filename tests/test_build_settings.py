@@ -0,0 +1,168 @@
+"""build_settings 的层级解析测试
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import build_settings
+import pbx_objects
+
+
+def make_graph(project_settings=None, target_settings=None, project_xcconfig=None, target_xcconfig=None):
+    """一个项目、一个 target（App）、一个 Release 配置的对象图"""
+    objects = {
+        "ROOT": {"isa": "PBXProject", "buildConfigurationList": "PROJECT_LIST", "mainGroup": "MAIN",
+                 "targets": ["APP"]},
+        "MAIN": {"isa": "PBXGroup", "children": [], "sourceTree": "<group>"},
+        "PROJECT_LIST": {"isa": "XCConfigurationList", "buildConfigurations": ["PROJECT_RELEASE"]},
+        "PROJECT_RELEASE": {"isa": "XCBuildConfiguration", "name": "Release",
+                            "buildSettings": project_settings or {}},
+        "APP": {"isa": "PBXNativeTarget", "name": "App", "buildConfigurationList": "APP_LIST",
+                "productType": "com.apple.product-type.application"},
+        "APP_LIST": {"isa": "XCConfigurationList", "buildConfigurations": ["APP_RELEASE"]},
+        "APP_RELEASE": {"isa": "XCBuildConfiguration", "name": "Release", "buildSettings": target_settings or {}},
+    }
+    for config_id, ref_id, path in (("PROJECT_RELEASE", "PROJECT_XCCONFIG", project_xcconfig),
+                                    ("APP_RELEASE", "APP_XCCONFIG", target_xcconfig)):
+        if path is not None:
+            objects[ref_id] = {"isa": "PBXFileReference", "path": path, "sourceTree": "SOURCE_ROOT"}
+            objects[config_id]["baseConfigurationReference"] = ref_id
+    return pbx_objects.graph_from_dict({"objects": objects, "rootObject": "ROOT"})
+
+
+class ResolverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def resolver(self, **layers):
+        return build_settings.BuildSettingsResolver(make_graph(**layers), self.root, "Weather")
+
+    def resolve(self, resolver, key):
+        return resolver.resolve("App", "Release", key)
+
+
+class LayerPrecedenceTests(ResolverTestCase):
+    def test_each_layer_overrides_the_one_below(self):
+        self.write("Project.xcconfig", "A = project-xcconfig\nB = project-xcconfig\nC = project-xcconfig\n"
+                                       "D = project-xcconfig\n")
+        self.write("App.xcconfig", "A = target-xcconfig\nB = target-xcconfig\n")
+        resolver = self.resolver(project_xcconfig="Project.xcconfig", target_xcconfig="App.xcconfig",
+                                 project_settings={"A": "project", "B": "project", "C": "project"},
+                                 target_settings={"A": "target"})
+        self.assertEqual(self.resolve(resolver, "A"), "target")
+        self.assertEqual(self.resolve(resolver, "B"), "target-xcconfig")
+        self.assertEqual(self.resolve(resolver, "C"), "project")
+        self.assertEqual(self.resolve(resolver, "D"), "project-xcconfig")
+        self.assertIsNone(self.resolve(resolver, "E"))
+        self.assertEqual(resolver.source_layer("App", "Release", "B"), "target xcconfig (App.xcconfig)")
+
+    def test_builtins(self):
+        resolver = self.resolver(target_settings={"BUNDLE": "com.example.$(TARGET_NAME).$(CONFIGURATION)"})
+        self.assertEqual(self.resolve(resolver, "BUNDLE"), "com.example.App.Release")
+        self.assertEqual(self.resolve(resolver, "PROJECT_NAME"), "Weather")
+
+
+class InheritedTests(ResolverTestCase):
+    def test_inherited_in_list(self):
+        resolver = self.resolver(project_settings={"FLAGS": ["-a", "-b"]},
+                                 target_settings={"FLAGS": ["$(inherited)", "-c"]})
+        self.assertEqual(self.resolve(resolver, "FLAGS"), ["-a", "-b", "-c"])
+
+    def test_inherited_list_from_string(self):
+        resolver = self.resolver(project_settings={"FLAGS": "-a -b"},
+                                 target_settings={"FLAGS": ["${inherited}", "-c"]})
+        self.assertEqual(self.resolve(resolver, "FLAGS"), ["-a", "-b", "-c"])
+
+    def test_inherited_in_string(self):
+        resolver = self.resolver(project_settings={"FLAGS": ["-a", "-b"]},
+                                 target_settings={"FLAGS": "$(inherited) -c"})
+        self.assertEqual(self.resolve(resolver, "FLAGS"), "-a -b -c")
+
+    def test_inherited_within_one_xcconfig(self):
+        # 同一文件中后面的定义继承前一个定义；第一个定义没有 $(inherited)，不再继承下层
+        self.write("App.xcconfig", "FLAGS = -a\nFLAGS = $(inherited) -b\n")
+        resolver = self.resolver(project_settings={"FLAGS": "-base"}, target_xcconfig="App.xcconfig")
+        self.assertEqual(self.resolve(resolver, "FLAGS"), "-a -b")
+
+        self.write("App.xcconfig", "FLAGS = $(inherited) -a\nFLAGS = $(inherited) -b\n")
+        resolver = self.resolver(project_settings={"FLAGS": "-base"}, target_xcconfig="App.xcconfig")
+        self.assertEqual(self.resolve(resolver, "FLAGS"), "-base -a -b")
+
+    def test_inherited_without_lower_definition(self):
+        resolver = self.resolver(target_settings={"FLAGS": "$(inherited) -c"})
+        self.assertEqual(self.resolve(resolver, "FLAGS"), " -c")
+
+
+class ReferenceTests(ResolverTestCase):
+    def test_nested_references_and_modifiers(self):
+        resolver = self.resolver(target_settings={
+            "NAME": "My App_2",
+            "KIND": "NAME",
+            "NESTED": "$($(KIND))",
+            "LOWER": "$(NAME:lower)",
+            "IDENT": "$(NAME:rfc1034identifier)",
+            "C99": "$(NAME:c99extidentifier)",
+            "CHAINED": "$(NAME:rfc1034identifier:upper)",
+            "DEFAULTED": "$(MISSING:default=fallback)",
+            "FILE": "$(PATH_SETTING:file)",
+            "PATH_SETTING": "dir/Config.plist",
+        })
+        self.assertEqual(self.resolve(resolver, "NESTED"), "My App_2")
+        self.assertEqual(self.resolve(resolver, "LOWER"), "my app_2")
+        self.assertEqual(self.resolve(resolver, "IDENT"), "My-App-2")
+        self.assertEqual(self.resolve(resolver, "C99"), "My_App_2")
+        self.assertEqual(self.resolve(resolver, "CHAINED"), "MY-APP-2")
+        self.assertEqual(self.resolve(resolver, "DEFAULTED"), "fallback")
+        self.assertEqual(self.resolve(resolver, "FILE"), "Config.plist")
+
+    def test_cycle_is_reported(self):
+        resolver = self.resolver(target_settings={"A": "$(B)", "B": "x$(A)"})
+        with self.assertRaises(build_settings.BuildSettingCycleError) as raised:
+            self.resolve(resolver, "A")
+        self.assertIn("A -> B -> A", str(raised.exception))
+
+    def test_self_reference_through_inherited_is_not_a_cycle(self):
+        resolver = self.resolver(project_settings={"A": "base"}, target_settings={"A": "$(inherited)-$(B)", "B": "b"})
+        self.assertEqual(self.resolve(resolver, "A"), "base-b")
+
+
+class XcconfigTests(ResolverTestCase):
+    def test_include_and_comments(self):
+        self.write("Shared.xcconfig", "SHARED = yes // trailing comment\nURL = \"http://example.com\"\n")
+        path = self.write("App.xcconfig", '#include "Shared.xcconfig"\n#include? "Missing.xcconfig"\n'
+                                          "// comment\nLOCAL = 1;\nSHARED = override\n")
+        self.assertEqual(build_settings.parse_xcconfig(path), [
+            ("SHARED", "yes"), ("URL", '"http://example.com"'), ("LOCAL", "1"), ("SHARED", "override"),
+        ])
+
+    def test_include_cycle(self):
+        self.write("A.xcconfig", '#include "B.xcconfig"\n')
+        self.write("B.xcconfig", '#include "A.xcconfig"\n')
+        with self.assertRaises(build_settings.BuildSettingCycleError):
+            build_settings.parse_xcconfig(os.path.join(self.root, "A.xcconfig"))
+
+    def test_same_file_included_twice_is_not_a_cycle(self):
+        self.write("Base.xcconfig", "BASE = 1\n")
+        self.write("Mid.xcconfig", '#include "Base.xcconfig"\n')
+        path = self.write("Top.xcconfig", '#include "Base.xcconfig"\n#include "Mid.xcconfig"\n')
+        self.assertEqual(build_settings.parse_xcconfig(path), [("BASE", "1"), ("BASE", "1")])
+
+    def test_preloaded_xcconfig_is_not_read_from_disk(self):
+        resolver = self.resolver(target_xcconfig="Virtual.xcconfig")
+        resolver.preload_xcconfig(os.path.join(self.root, "Virtual.xcconfig"), [("FROM_MEMORY", "1")])
+        self.assertEqual(self.resolve(resolver, "FROM_MEMORY"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+"""dedupe_build_settings 生成的 xcconfig 文本测试
+
+  python3 -m unittest discover -s tests
+"""
+
+import unittest
+
+import dedupe_build_settings
+
+
+class RenderTests(unittest.TestCase):
+    def test_rendered_files_parse_back_to_the_plan(self):
+        files = [
+            ("Shared.xcconfig", None, {"SWIFT_VERSION": "5.0", "OTHER_LDFLAGS": ["-ObjC", "-lz"]}),
+            ("App.xcconfig", "Shared.xcconfig", {"INFOPLIST_KEY_CFBundleDisplayName": '"Weather Pro"',
+                                                 "LD_RUNPATH_SEARCH_PATHS": ["$(inherited)", "@executable_path/Frameworks"]}),
+        ]
+        rendered = {name: dedupe_build_settings.render_xcconfig(include, values) for name, include, values in files}
+        parsed = dedupe_build_settings.parse_rendered(rendered)
+        self.assertEqual(parsed["Shared.xcconfig"], [("OTHER_LDFLAGS", "-ObjC -lz"), ("SWIFT_VERSION", "5.0")])
+        self.assertEqual(parsed["App.xcconfig"], parsed["Shared.xcconfig"] + [
+            ("INFOPLIST_KEY_CFBundleDisplayName", '"Weather Pro"'),
+            ("LD_RUNPATH_SEARCH_PATHS", "$(inherited) @executable_path/Frameworks"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
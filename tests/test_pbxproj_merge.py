@@ -0,0 +1,209 @@
+"""pbxproj_merge 的三方合并与 merge driver 测试
+
+  python3 -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import pbxproj
+import pbxproj_merge
+
+
+def make_project(objects):
+    return {
+        "archiveVersion": "1",
+        "classes": {},
+        "objectVersion": "77",
+        "objects": objects,
+        "rootObject": "ROOT",
+    }
+
+
+def base_objects():
+    return {
+        "ROOT": {"isa": "PBXProject", "mainGroup": "MAIN", "targets": ["APP"]},
+        "MAIN": {"isa": "PBXGroup", "children": ["FILE_A", "FILE_B"], "sourceTree": "<group>"},
+        "FILE_A": {"isa": "PBXFileReference", "path": "A.swift", "sourceTree": "<group>"},
+        "FILE_B": {"isa": "PBXFileReference", "path": "B.swift", "sourceTree": "<group>"},
+        "APP": {"isa": "PBXNativeTarget", "name": "App", "buildPhases": ["SOURCES"]},
+        "SOURCES": {"isa": "PBXSourcesBuildPhase", "files": ["BUILD_A"]},
+        "BUILD_A": {"isa": "PBXBuildFile", "fileRef": "FILE_A"},
+        "CONFIG": {
+            "isa": "XCBuildConfiguration",
+            "name": "Release",
+            "buildSettings": {"SWIFT_VERSION": "5.0", "MARKETING_VERSION": "1.0"},
+        },
+    }
+
+
+def variant(**changes):
+    """在基线对象上应用修改；值为 None 表示删除该对象"""
+    objects = base_objects()
+    for object_id, value in changes.items():
+        if value is None:
+            objects.pop(object_id, None)
+        else:
+            objects[object_id] = value
+    return make_project(objects)
+
+
+class MergeListTests(unittest.TestCase):
+    def test_both_sides_append(self):
+        # 对方新增的元素紧跟在它在对方列表中的前一个元素之后
+        self.assertEqual(pbxproj_merge._merge_lists(["A", "B"], ["A", "B", "C"], ["A", "B", "D"]),
+                         ["A", "B", "D", "C"])
+
+    def test_insert_after_previous_element(self):
+        self.assertEqual(pbxproj_merge._merge_lists(["A", "B"], ["A", "B"], ["A", "X", "B"]),
+                         ["A", "X", "B"])
+
+    def test_removal_on_either_side(self):
+        self.assertEqual(pbxproj_merge._merge_lists(["A", "B", "C"], ["A", "C"], ["A", "B", "C", "D"]),
+                         ["A", "C", "D"])
+        self.assertEqual(pbxproj_merge._merge_lists(["A", "B", "C"], ["A", "B", "C", "D"], ["B", "C"]),
+                         ["B", "C", "D"])
+
+    def test_children_merged_inside_project(self):
+        ours = variant(MAIN={"isa": "PBXGroup", "children": ["FILE_A", "FILE_B", "FILE_C"],
+                             "sourceTree": "<group>"},
+                       FILE_C={"isa": "PBXFileReference", "path": "C.swift", "sourceTree": "<group>"})
+        theirs = variant(MAIN={"isa": "PBXGroup", "children": ["FILE_A", "FILE_B", "FILE_D"],
+                               "sourceTree": "<group>"},
+                         FILE_D={"isa": "PBXFileReference", "path": "D.swift", "sourceTree": "<group>"})
+        result, conflicts = pbxproj_merge.merge_projects(variant(), ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(result["objects"]["MAIN"]["children"], ["FILE_A", "FILE_B", "FILE_D", "FILE_C"])
+        self.assertIn("FILE_C", result["objects"])
+        self.assertIn("FILE_D", result["objects"])
+
+
+class MergeDictTests(unittest.TestCase):
+    def config(self, **settings):
+        values = {"SWIFT_VERSION": "5.0", "MARKETING_VERSION": "1.0"}
+        values.update(settings)
+        values = {k: v for k, v in values.items() if v is not None}
+        return {"isa": "XCBuildConfiguration", "name": "Release", "buildSettings": values}
+
+    def test_different_keys_merge_cleanly(self):
+        ours = variant(CONFIG=self.config(MARKETING_VERSION="1.1"))
+        theirs = variant(CONFIG=self.config(SWIFT_VERSION="6.0", CODE_SIGN_STYLE="Automatic"))
+        result, conflicts = pbxproj_merge.merge_projects(variant(), ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(result["objects"]["CONFIG"]["buildSettings"], {
+            "SWIFT_VERSION": "6.0", "MARKETING_VERSION": "1.1", "CODE_SIGN_STYLE": "Automatic",
+        })
+
+    def test_key_removed_by_one_side(self):
+        ours = variant(CONFIG=self.config(MARKETING_VERSION=None))
+        result, conflicts = pbxproj_merge.merge_projects(variant(), ours, variant())
+        self.assertEqual(conflicts, [])
+        self.assertNotIn("MARKETING_VERSION", result["objects"]["CONFIG"]["buildSettings"])
+
+    def test_same_key_changed_differently_conflicts(self):
+        ours = variant(CONFIG=self.config(MARKETING_VERSION="1.1"))
+        theirs = variant(CONFIG=self.config(MARKETING_VERSION="2.0"))
+        result, conflicts = pbxproj_merge.merge_projects(variant(), ours, theirs)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].object_id, "CONFIG")
+        self.assertEqual(conflicts[0].path, ("buildSettings", "MARKETING_VERSION"))
+        self.assertEqual(result["objects"]["CONFIG"]["buildSettings"]["MARKETING_VERSION"], "1.1")
+
+
+class MergeConflictTests(unittest.TestCase):
+    def test_delete_modify_conflict(self):
+        ours = variant(FILE_B=None, MAIN={"isa": "PBXGroup", "children": ["FILE_A"], "sourceTree": "<group>"})
+        theirs = variant(FILE_B={"isa": "PBXFileReference", "path": "Renamed.swift", "sourceTree": "<group>"})
+        _, conflicts = pbxproj_merge.merge_projects(variant(), ours, theirs)
+        self.assertEqual([(c.object_id, c.path) for c in conflicts], [("FILE_B", ())])
+        self.assertIs(conflicts[0].ours, pbxproj_merge._MISSING)
+
+    def test_dangling_reference(self):
+        # 我方删除了 FILE_A，对方把它加入了新的 build file
+        ours = variant(FILE_A=None, BUILD_A=None,
+                       MAIN={"isa": "PBXGroup", "children": ["FILE_B"], "sourceTree": "<group>"},
+                       SOURCES={"isa": "PBXSourcesBuildPhase", "files": []})
+        theirs = variant(BUILD_A2={"isa": "PBXBuildFile", "fileRef": "FILE_A"},
+                         SOURCES={"isa": "PBXSourcesBuildPhase", "files": ["BUILD_A", "BUILD_A2"]})
+        result, conflicts = pbxproj_merge.merge_projects(variant(), ours, theirs)
+        self.assertEqual([(c.object_id, c.path, c.ours) for c in conflicts], [("BUILD_A2", ("fileRef",), "FILE_A")])
+        self.assertEqual(result["objects"]["SOURCES"]["files"], ["BUILD_A2"])
+
+
+class DiffTests(unittest.TestCase):
+    def test_reference_list_changes(self):
+        new = variant(SOURCES={"isa": "PBXSourcesBuildPhase", "files": ["BUILD_B"]},
+                      BUILD_A=None, BUILD_B={"isa": "PBXBuildFile", "fileRef": "FILE_B"})
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(pbxproj_merge.print_diff(variant(), new))
+        lines = output.getvalue().splitlines()
+        self.assertIn("    files + BUILD_B B.swift in Sources", lines)
+        self.assertIn("    files - BUILD_A A.swift in Sources", lines)
+
+    def test_identical_projects(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(pbxproj_merge.print_diff(variant(), variant()))
+
+
+class MergeDriverTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, project=None, text=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text if text is not None else pbxproj.dump_pbxproj(project, "Weather"))
+        return path
+
+    def run_driver(self, base, ours, theirs):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = pbxproj_merge.main(["merge", base, ours, theirs, "-o", ours])
+        return status, stderr.getvalue()
+
+    def test_empty_base_is_treated_as_empty_project(self):
+        base = self.write("base", text="")
+        ours = self.write("ours", variant())
+        theirs = self.write("theirs", variant(FILE_C={"isa": "PBXFileReference", "path": "C.swift",
+                                                      "sourceTree": "<group>"}))
+        status, _ = self.run_driver(base, ours, theirs)
+        self.assertEqual(status, 0)
+        self.assertIn("FILE_C", pbxproj.load_project(ours)["objects"])
+
+    def test_unparseable_side_leaves_ours_untouched(self):
+        base = self.write("base", variant())
+        ours = self.write("ours", variant())
+        theirs = self.write("theirs", text="// !$*UTF8*$!\n{\n\tobjects = {\n")
+        with open(ours, "rb") as f:
+            before = f.read()
+        status, stderr = self.run_driver(base, ours, theirs)
+        self.assertNotEqual(status, 0)
+        self.assertIn(theirs, stderr)
+        with open(ours, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+    def test_conflicts_written_to_sidecar(self):
+        base = self.write("base", variant())
+        ours = self.write("ours", variant(FILE_A={"isa": "PBXFileReference", "path": "Ours.swift",
+                                                  "sourceTree": "<group>"}))
+        theirs = self.write("theirs", variant(FILE_A={"isa": "PBXFileReference", "path": "Theirs.swift",
+                                                      "sourceTree": "<group>"}))
+        status, _ = self.run_driver(base, ours, theirs)
+        self.assertEqual(status, 1)
+        with open(ours + pbxproj_merge.CONFLICTS_SUFFIX, encoding="utf-8") as f:
+            self.assertIn("FILE_A path", f.read())
+
+        # 再次合并成功后删除旧的冲突列表
+        theirs = self.write("theirs", variant())
+        status, _ = self.run_driver(base, ours, theirs)
+        self.assertEqual(status, 0)
+        self.assertFalse(os.path.exists(ours + pbxproj_merge.CONFLICTS_SUFFIX))
+
+
+if __name__ == "__main__":
+    unittest.main()
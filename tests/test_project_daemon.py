@@ -0,0 +1,99 @@
+"""project_daemon 与 project_client 的测试：在临时项目目录中启动常驻进程
+
+  python3 -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import os
+import plistlib
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import pbxproj
+import project_client
+import project_daemon
+import project_paths
+
+PROJECT = {
+    "archiveVersion": "1",
+    "classes": {},
+    "objectVersion": "77",
+    "objects": {
+        "ROOT": {"isa": "PBXProject", "mainGroup": "MAIN", "targets": ["APP"]},
+        "MAIN": {"isa": "PBXGroup", "children": [], "sourceTree": "<group>"},
+        "APP": {"isa": "PBXNativeTarget", "name": "App", "buildPhases": []},
+    },
+    "rootObject": "ROOT",
+}
+
+
+class DaemonTests(unittest.TestCase):
+    def setUp(self):
+        # Unix socket 路径长度有限，使用较短的临时目录
+        self.root = tempfile.mkdtemp(prefix="wt")
+        self.addCleanup(shutil.rmtree, self.root, True)
+        project_path = project_paths.project_file(self.root)
+        os.makedirs(os.path.dirname(project_path))
+        with open(project_path, "w", encoding="utf-8") as f:
+            f.write(pbxproj.dump_pbxproj(PROJECT, "Weather"))
+
+        self.socket_path = os.path.join(self.root, project_client.SOCKET_NAME)
+        self.output = io.StringIO()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        self.addCleanup(self._stop)
+        self._wait_until_ready()
+
+    def _serve(self):
+        with contextlib.redirect_stdout(self.output), contextlib.redirect_stderr(self.output):
+            project_daemon.serve(self.root, self.socket_path)
+
+    def _wait_until_ready(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                project_client.query("ping", socket_path=self.socket_path)
+                return
+            except OSError:
+                time.sleep(0.02)
+        self.fail("常驻进程没有启动")
+
+    def _stop(self):
+        with contextlib.suppress(OSError):
+            project_client.query("shutdown", socket_path=self.socket_path)
+        self.thread.join(5)
+
+    def query(self, command, *args):
+        return project_client.query(command, *args, socket_path=self.socket_path)
+
+    def test_plist_with_data_and_date_values(self):
+        value = {"Blob": b"\x00\x01binary", "When": datetime(2024, 5, 1, 8, 30), "Name": "Weather"}
+        path = os.path.join(self.root, "Data.plist")
+        with open(path, "wb") as f:
+            plistlib.dump(value, f)
+
+        self.assertEqual(project_client.read_plist(path, self.root), value)
+        # 常驻进程仍在运行，并返回了编码后的值而不是退回本地解析
+        self.assertEqual(self.query("ping"), "pong")
+        self.assertEqual(self.query("plist", "Data.plist")["Blob"], {"$data": "AAFiaW5hcnk="})
+
+    def test_failed_request_does_not_stop_daemon(self):
+        with self.assertRaises(RuntimeError):
+            self.query("plist", "Missing.plist")
+        with self.assertRaises(RuntimeError):
+            self.query("no-such-command")
+        self.assertEqual(self.query("ping"), "pong")
+
+    def test_graph_matches_local_parse(self):
+        graph = project_client.load_graph(root=self.root)
+        self.assertEqual([target.name for target in graph.targets()], ["App"])
+        self.assertEqual(self.query("targets"), {"App": "APP"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""weather_fixtures 存储与录制命令的测试
+
+  python3 -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from urllib.error import URLError
+
+import weather_fixtures
+
+
+class FixtureStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store_dir = os.path.join(self.tmp.name, "weather")
+
+    def test_put_and_get_with_normalized_params(self):
+        with weather_fixtures.FixtureStore(self.store_dir) as store:
+            store.put("weather", {"lat": "31.2", "lon": "121.5", "appid": "secret"}, '{"temp": 20}')
+            status, body = store.get("/api/weather", {"lat": "31.20000", "lon": "121.5", "units": "metric"})
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"temp": 20}')
+
+    def test_missing_key_returns_none(self):
+        with weather_fixtures.FixtureStore(self.store_dir) as store:
+            self.assertIsNone(store.get("forecast", {"city": "shanghai"}))
+
+    def test_overwrite_compact_and_reopen(self):
+        with weather_fixtures.FixtureStore(self.store_dir) as store:
+            store.put("search", {"q": "Beijing"}, b"old")
+            store.put("search", {"q": "Shanghai"}, b"other")
+            # 读取一次以建立 mmap，再追加新记录，确认重新映射
+            self.assertEqual(store.get("search", {"q": "beijing"}), (200, b"old"))
+            store.put("search", {"q": "beijing"}, b"new", status=201)
+            self.assertEqual(store.get("search", {"q": "BEIJING"}), (201, b"new"))
+            self.assertEqual(store.compact(), 2)
+
+        with weather_fixtures.FixtureStore(self.store_dir) as store:
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.get("search", {"q": "beijing"}), (201, b"new"))
+            self.assertEqual(store.get("search", {"q": "shanghai"}), (200, b"other"))
+        blob_size = os.path.getsize(os.path.join(self.store_dir, weather_fixtures.BLOB_FILE))
+        self.assertEqual(blob_size, sum(e["length"] for e in store.index.values()))
+
+    def test_invalid_coordinate(self):
+        with self.assertRaises(ValueError):
+            weather_fixtures.fixture_key("weather", {"lat": "north"})
+
+
+class RecordCommandTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.original_fetch = weather_fixtures.fetch_live
+        self.addCleanup(setattr, weather_fixtures, "fetch_live", self.original_fetch)
+
+    def record(self, *args):
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            status = weather_fixtures.main(["--store", self.tmp.name, "record", "weather", *args])
+        with weather_fixtures.FixtureStore(self.tmp.name) as store:
+            return status, len(store), stderr.getvalue()
+
+    def test_error_response_is_not_recorded(self):
+        weather_fixtures.fetch_live = lambda *args: (500, b'{"error": "API key not configured"}')
+        self.assertEqual(self.record("city=x")[:2], (1, 0))
+        self.assertEqual(self.record("city=x", "--allow-error")[:2], (0, 1))
+
+    def test_unreachable_proxy(self):
+        def fail(*args):
+            raise URLError(ConnectionRefusedError(111, "Connection refused"))
+        weather_fixtures.fetch_live = fail
+        status, count, stderr = self.record("city=x")
+        self.assertEqual((status, count), (1, 0))
+        self.assertIn("❌", stderr)
+
+    def test_bad_arguments(self):
+        self.assertEqual(self.record("city")[0], 2)
+        self.assertEqual(self.record("lat=abc")[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
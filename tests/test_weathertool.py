@@ -0,0 +1,43 @@
+"""weathertool 入口和各子命令的启动开销测试
+
+  python3 -m unittest discover -s tests
+"""
+
+import unittest
+
+import weathertool
+
+
+def slowest(extra):
+    return sorted(extra.items(), key=lambda item: -item[1])[:5]
+
+
+class StartupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # python -X importtime weathertool.py --help
+        cls.total_ms, cls.extra, cls.eager = weathertool.measure_startup()
+
+    def test_subcommand_modules_are_imported_lazily(self):
+        self.assertEqual(self.eager, [], "weathertool.py --help 不应导入子命令模块")
+
+    def test_startup_within_budget(self):
+        self.assertLessEqual(self.total_ms, weathertool.DEFAULT_STARTUP_BUDGET_MS,
+                             f"额外导入耗时 {self.total_ms:.1f} ms，最慢的模块: {slowest(self.extra)}")
+
+
+class CommandStartupTests(unittest.TestCase):
+    def test_each_command(self):
+        # python -X importtime weathertool.py <子命令> --help
+        for command, (module, _, _) in weathertool.COMMANDS.items():
+            with self.subTest(command=command):
+                total_ms, extra, eager = weathertool.measure_startup(command)
+                self.assertIn(module, extra)
+                self.assertEqual(eager, [], f"{command} --help 只应导入 {module}")
+                self.assertLessEqual(total_ms, weathertool.DEFAULT_COMMAND_BUDGET_MS,
+                                     f"{command} --help 额外导入耗时 {total_ms:.1f} ms，"
+                                     f"最慢的模块: {slowest(extra)}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+天气 API 响应录制 / 回放工具
+
+把 /api/weather、/api/forecast、/api/search 的真实响应录制到本地的
+只追加存储中（zlib 压缩数据块 + 按 endpoint 和规范化参数建立的索引），
+之后截图生成和代理测试可以直接回放，无需联网。
+
+存储格式（默认位于 Fixtures/weather/）：
+  responses.bin  依次追加的压缩响应体
+  index.jsonl    每行一条记录 {key, offset, length, status, recorded_at}，
+                 后写入的同 key 记录覆盖先前的记录
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+import project_paths
+
+PROJECT_ROOT = project_paths.find_project_root()
+DEFAULT_STORE_DIR = os.path.join(PROJECT_ROOT, "Fixtures", "weather")
+DEFAULT_BASE_URL = "https://vercel-proxy-weis-projects-90c8634a.vercel.app"
+
+BLOB_FILE = "responses.bin"
+INDEX_FILE = "index.jsonl"
+
+# 与 vercel-proxy/api/*.js 中的默认参数保持一致，省略默认值的请求命中同一条记录
+ENDPOINT_DEFAULTS = {
+    "weather": {"lang": "zh_cn", "units": "metric"},
+    "forecast": {"lang": "zh_cn", "units": "metric"},
+    "search": {"limit": "5"},
+}
+
+# 不参与 key 计算的参数（密钥等）
+IGNORED_PARAMS = {"appid", "api_key", "apikey"}
+
+
+def normalize_endpoint(endpoint):
+    """把 '/api/weather'、'weather' 等写法统一为 'weather'"""
+    name = endpoint.strip().strip("/")
+    if name.startswith("api/"):
+        name = name[len("api/"):]
+    if name not in ENDPOINT_DEFAULTS:
+        raise ValueError(f"未知的 endpoint: {endpoint}")
+    return name
+
+
+def normalize_params(endpoint, params):
+    """规范化请求参数：补齐默认值、去掉密钥、统一大小写和坐标精度"""
+    normalized = dict(ENDPOINT_DEFAULTS[endpoint])
+    for key, value in params.items():
+        key = key.strip().lower()
+        if key in IGNORED_PARAMS:
+            continue
+        value = str(value).strip()
+        if key in ("lat", "lon"):
+            try:
+                value = f"{float(value):.4f}"
+            except ValueError:
+                raise ValueError(f"{key} 应为数字: {value}") from None
+        elif key in ("city", "q", "lang", "units"):
+            value = value.lower()
+        normalized[key] = value
+    return normalized
+
+
+def fixture_key(endpoint, params):
+    """生成索引 key：endpoint + 排序后的规范化参数"""
+    endpoint = normalize_endpoint(endpoint)
+    normalized = normalize_params(endpoint, params)
+    return endpoint + "?" + urlencode(sorted(normalized.items()))
+
+
+class FixtureStore:
+    """只追加的压缩响应存储，索引常驻内存，数据块通过 mmap 读取"""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self.blob_path = os.path.join(store_dir, BLOB_FILE)
+        self.index_path = os.path.join(store_dir, INDEX_FILE)
+        self.index = {}
+        self._map = None
+        self._map_size = 0
+        self._blob_file = None
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self.index[entry["key"]] = entry
+
+    def _ensure_map(self, end):
+        """保证 mmap 覆盖到 end 位置；文件追加后重新映射"""
+        if self._map is not None and end <= self._map_size:
+            return
+        self.close()
+        self._blob_file = open(self.blob_path, "rb")
+        self._map = mmap.mmap(self._blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map_size = len(self._map)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._map_size = 0
+        if self._blob_file is not None:
+            self._blob_file.close()
+            self._blob_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def put(self, endpoint, params, body, status=200):
+        """追加一条响应记录，返回索引 key"""
+        key = fixture_key(endpoint, params)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        blob = zlib.compress(body, 9)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(self.blob_path, "ab") as f:
+            offset = f.tell()
+            f.write(blob)
+
+        entry = {
+            "key": key,
+            "offset": offset,
+            "length": len(blob),
+            "status": status,
+            "recorded_at": int(time.time()),
+        }
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.index[key] = entry
+        return key
+
+    def get(self, endpoint, params):
+        """按 endpoint + 参数查找记录，返回 (status, body bytes)；不存在时返回 None"""
+        entry = self.index.get(fixture_key(endpoint, params))
+        if entry is None:
+            return None
+        start = entry["offset"]
+        end = start + entry["length"]
+        self._ensure_map(end)
+        return entry["status"], zlib.decompress(self._map[start:end])
+
+    def compact(self):
+        """重写存储，只保留每个 key 的最新记录"""
+        entries = sorted(self.index.values(), key=lambda e: e["offset"])
+        if not entries:
+            return 0
+        self._ensure_map(max(e["offset"] + e["length"] for e in entries))
+        blobs = [self._map[e["offset"]:e["offset"] + e["length"]] for e in entries]
+        self.close()
+
+        tmp_blob = self.blob_path + ".tmp"
+        tmp_index = self.index_path + ".tmp"
+        offset = 0
+        with open(tmp_blob, "wb") as bf, open(tmp_index, "w", encoding="utf-8") as xf:
+            for entry, blob in zip(entries, blobs):
+                bf.write(blob)
+                entry = dict(entry, offset=offset)
+                xf.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.index[entry["key"]] = entry
+                offset += len(blob)
+        os.replace(tmp_blob, self.blob_path)
+        os.replace(tmp_index, self.index_path)
+        return len(entries)
+
+
+def fetch_live(base_url, endpoint, params, bundle_id=None):
+    """请求线上代理，返回 (status, body bytes)"""
+    url = f"{base_url.rstrip('/')}/api/{endpoint}?{urlencode(params)}"
+    request = Request(url)
+    if bundle_id:
+        request.add_header("X-App-Bundle-ID", bundle_id)
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status, response.read()
+    except HTTPError as e:
+        return e.code, e.read()
+
+
+def parse_param_args(items):
+    """把命令行的 key=value 列表转换为 dict"""
+    params = {}
+    for item in items:
+        if "=" not in item:
+            raise ValueError(f"参数格式应为 key=value: {item}")
+        key, value = item.split("=", 1)
+        params[key] = value
+    return params
+
+
+def make_replay_handler(store):
+    """创建回放 HTTP handler，行为与 vercel-proxy 的接口一致"""
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            try:
+                endpoint = normalize_endpoint(parts.path)
+                result = store.get(endpoint, dict(parse_qsl(parts.query)))
+            except ValueError as e:
+                result = (400, json.dumps({"error": str(e)}).encode("utf-8"))
+            if result is None:
+                result = (404, json.dumps({"error": "Fixture not recorded"}).encode("utf-8"))
+            status, body = result
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="录制 / 回放天气 API 响应")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="存储目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="请求线上代理并录制响应")
+    record.add_argument("endpoint", choices=sorted(ENDPOINT_DEFAULTS))
+    record.add_argument("params", nargs="*", help="key=value 形式的请求参数")
+    record.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    record.add_argument("--bundle-id", default="com.weiproduct.WeiWeathers")
+    record.add_argument("--allow-error", action="store_true",
+                        help="同时录制非 2xx 的错误响应（默认拒绝，避免把错误当作标准响应回放）")
+
+    replay = sub.add_parser("replay", help="输出已录制的响应")
+    replay.add_argument("endpoint", choices=sorted(ENDPOINT_DEFAULTS))
+    replay.add_argument("params", nargs="*", help="key=value 形式的请求参数")
+
+    sub.add_parser("list", help="列出所有录制的 key")
+    sub.add_parser("compact", help="清理被覆盖的旧记录")
+
+    serve = sub.add_parser("serve", help="以代理接口的形式回放录制的响应")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8787)
+
+    args = parser.parse_args(argv)
+
+    with FixtureStore(args.store) as store:
+        if args.command == "record":
+            try:
+                params = parse_param_args(args.params)
+                fixture_key(args.endpoint, params)
+            except ValueError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 2
+            try:
+                status, body = fetch_live(args.base_url, args.endpoint, params, args.bundle_id)
+            except (URLError, OSError) as e:
+                # 代理不可达、DNS 失败、超时等（HTTPError 已在 fetch_live 中转换为状态码）
+                reason = e.reason if isinstance(e, URLError) else e
+                print(f"❌ 请求 {args.base_url} 失败，未录制: {reason}", file=sys.stderr)
+                return 1
+            if not 200 <= status < 300 and not args.allow_error:
+                print(f"❌ 代理返回 HTTP {status}，未录制（使用 --allow-error 强制录制）: "
+                      f"{body[:200].decode('utf-8', 'replace')}", file=sys.stderr)
+                return 1
+            key = store.put(args.endpoint, params, body, status)
+            mark = "✅" if 200 <= status < 300 else "⚠️ "
+            print(f"{mark} 已录制 {key} (HTTP {status}, {len(body)} 字节)")
+
+        elif args.command == "replay":
+            try:
+                result = store.get(args.endpoint, parse_param_args(args.params))
+            except ValueError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 2
+            if result is None:
+                print("❌ 没有找到对应的录制记录", file=sys.stderr)
+                return 1
+            sys.stdout.write(result[1].decode("utf-8"))
+
+        elif args.command == "list":
+            for key in sorted(store.index):
+                entry = store.index[key]
+                print(f"  {key}  (HTTP {entry['status']}, {entry['length']} 字节)")
+            print(f"共 {len(store)} 条记录")
+
+        elif args.command == "compact":
+            count = store.compact()
+            print(f"✅ 压缩完成，保留 {count} 条记录")
+
+        elif args.command == "serve":
+            server = HTTPServer((args.host, args.port), make_replay_handler(store))
+            print(f"🚀 回放服务已启动: http://{args.host}:{args.port}/api/weather")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
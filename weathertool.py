@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Weather 项目工具统一入口
+
+  python3 weathertool.py [--root DIR] [--profile[=前缀]] <子命令> [参数...]
+  python3 weathertool.py <子命令> --help
+
+子命令对应的模块只在调用时才导入，入口本身只依赖 os / sys，
+CI 中频繁调用时不会为用不到的工具付出导入开销。
+项目根目录按 project_paths.find_project_root() 的规则查找，
+也可以用 --root 或环境变量 WEATHER_PROJECT_ROOT 指定。
+
+--profile（或环境变量 WEATHER_TOOL_PROFILE，便于在 CI 中开启）在 cProfile 下
+运行子命令，写出 pstats 和 Chrome trace，详见 instrumentation.py。
+
+  python3 weathertool.py check-startup [--budget-ms N] [--command-budget-ms N]
+                                   # 用 python -X importtime 检查入口和每个子命令的启动开销
+                                   # （tests/test_weathertool.py 在 CI 中执行同样的检查）
+"""
+
+import os
+import sys
+
+# 子命令 -> (模块, 预置参数, 说明)
+COMMANDS = {
+    "add-extension": ("add_widget_to_project", [], "把 Widget Extension 添加到 Xcode 项目"),
+    "sync-sources": ("fix_xcode_project", [], "把 Swift 源文件同步到项目文件"),
+    "preflight": ("app_store_preflight_check", [], "App Store 上架前检查"),
+    "configure-widget": ("configure_widget", [], "生成 Widget 所需的配置和文件"),
+    "fixtures": ("weather_fixtures", [], "录制 / 回放天气 API 响应"),
+    "daemon": ("project_daemon", [], "项目文件常驻解析服务"),
+    "diff": ("pbxproj_merge", ["diff"], "project.pbxproj 结构化 diff"),
+    "merge": ("pbxproj_merge", ["merge"], "project.pbxproj 三方合并"),
+    "settings": ("build_settings", [], "查询有效 build settings"),
+    "l10n": ("localization_check", [], "检查本地化 key 是否缺失、未使用或格式不一致"),
+    "membership": ("target_membership", [], "检查文件的 target 成员关系"),
+    "dedupe-settings": ("dedupe_build_settings", [], "把重复的 build setting 提取到 xcconfig"),
+}
+
+# 子命令模块之间允许的依赖：作为库使用，而不是提前导入了别的子命令
+COMMAND_DEPENDENCIES = {
+    "dedupe_build_settings": {"build_settings"},
+}
+
+DEFAULT_STARTUP_BUDGET_MS = 20.0
+# `<子命令> --help` 的预算：包含子命令模块自身及其依赖（argparse、http.server 等）
+DEFAULT_COMMAND_BUDGET_MS = 120.0
+
+
+def print_usage(out=sys.stdout):
+    out.write("用法: weathertool.py [--root DIR] [--profile[=前缀]] <子命令> [参数...]\n\n子命令:\n")
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, _, help_text) in COMMANDS.items():
+        out.write(f"  {name.ljust(width)}  {help_text}\n")
+    out.write(f"  {'check-startup'.ljust(width)}  检查入口的导入开销\n")
+
+
+def _import_times(args):
+    """以 -X importtime 运行 python 参数 args
+
+    返回 ({模块名: 累计微秒}（只统计顶层导入）, 导入的所有模块名集合)。
+    """
+    import subprocess
+
+    result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, check=True)
+    times, imported = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2]
+        imported.add(name.strip())
+        # 嵌套导入带缩进，累计时间已计入外层模块
+        if not name.startswith("  "):
+            times[name.strip()] = int(fields[1])
+    return times, imported
+
+
+def measure_startup(command=None):
+    """运行 `python -X importtime weathertool.py [子命令] --help`
+
+    返回 (相对空解释器多出的导入耗时 ms, {模块名: 微秒}, 多导入的子命令模块列表)。
+    除了子命令自己的模块和 COMMAND_DEPENDENCIES 中声明的依赖，不应导入其他子命令模块。
+    """
+    baseline, _ = _import_times(["-c", "pass"])
+    measured, imported = _import_times([os.path.abspath(__file__), *([command] if command else []), "--help"])
+    extra = {name: us for name, us in measured.items() if name not in baseline}
+    expected = set()
+    if command:
+        module = COMMANDS[command][0]
+        expected = {module} | COMMAND_DEPENDENCIES.get(module, set())
+    eager = sorted(({module for module, _, _ in COMMANDS.values()} & imported) - expected)
+    return sum(extra.values()) / 1000, extra, eager
+
+
+def check_startup(argv):
+    """检查 `weathertool.py --help` 和每个 `weathertool.py <子命令> --help` 的导入开销是否在预算内"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="weathertool.py check-startup",
+                                     description="用 python -X importtime 检查入口和子命令的启动开销")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        help=f"入口允许的额外导入时间（默认 {DEFAULT_STARTUP_BUDGET_MS:g} ms）")
+    parser.add_argument("--command-budget-ms", type=float, default=DEFAULT_COMMAND_BUDGET_MS,
+                        help=f"每个子命令允许的额外导入时间（默认 {DEFAULT_COMMAND_BUDGET_MS:g} ms）")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for command in (None, *COMMANDS):
+        label = f"{command} --help" if command else "--help"
+        budget = args.command_budget_ms if command else args.budget_ms
+        total_ms, extra, eager = measure_startup(command)
+        if eager:
+            print(f"❌ {label} 导入了其他子命令模块: {', '.join(eager)}")
+            ok = False
+        if total_ms > budget:
+            print(f"❌ {label} 额外导入耗时 {total_ms:.1f} ms，超过预算 {budget:g} ms")
+            for name, us in sorted(extra.items(), key=lambda item: -item[1])[:5]:
+                print(f"  {name}: {us / 1000:.1f} ms")
+            ok = False
+        elif not eager:
+            print(f"✅ {label} 额外导入耗时 {total_ms:.1f} ms（预算 {budget:g} ms）")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    profile = os.environ.get("WEATHER_TOOL_PROFILE")
+
+    # 全局选项只在子命令之前识别，之后的参数原样交给子命令
+    while argv and argv[0].startswith("--"):
+        option, has_value, value = argv[0].partition("=")
+        if option == "--root":
+            if not has_value:
+                if len(argv) < 2:
+                    sys.stderr.write("--root 需要一个目录参数\n")
+                    return 2
+                value = argv.pop(1)
+            os.environ["WEATHER_PROJECT_ROOT"] = os.path.abspath(value)
+        elif option == "--profile":
+            profile = value or "1"
+        else:
+            break
+        argv.pop(0)
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    if command == "check-startup":
+        return check_startup(args)
+    if command not in COMMANDS:
+        sys.stderr.write(f"未知的子命令: {command}\n\n")
+        print_usage(sys.stderr)
+        return 2
+
+    # 用 __import__ 而不是 importlib.import_module：后者不经过 -X importtime 的计时，
+    # 子命令模块不会出现在导入树中，check-startup 就分不清是谁导入了什么
+    module_name, preset, _ = COMMANDS[command]
+    if not profile or profile == "0":
+        result = __import__(module_name).main(preset + args)
+        return 0 if result is None else result
+
+    import instrumentation
+
+    with instrumentation.profile_session(instrumentation.profile_prefix(profile, command), command):
+        result = __import__(module_name).main(preset + args)
+    return 0 if result is None else result
+
+
+if __name__ == "__main__":
+    sys.exit(main())